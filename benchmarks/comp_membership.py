@@ -0,0 +1,60 @@
+"""
+Cost of `x in COMP` / `x in COMP(...)` / `x in LAZY_COMP` with the class
+flag and per-component verdicts, against the previous path that derived
+TYPE(x) and re-walked the parametrized constraints on every check.
+
+    python benchmarks/comp_membership.py [number]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typed import TYPE, Str
+from comp import comp, COMP, LAZY_COMP, Jinja
+
+@comp(lazy=False)
+def eager(text: Str="") -> Jinja:
+    return """jinja
+<p>[[ text ]]</p>
+"""
+
+@comp
+def lazy(text: Str="") -> Jinja:
+    return """jinja
+<p>[[ text ]]</p>
+"""
+
+def legacy_in(instance, cls):
+    if getattr(instance, "is_lazy", False):
+        instance = getattr(instance, "_wrapped", None)
+        if instance is None:
+            return False
+    if not TYPE(instance) <= COMP:
+        return False
+    if cls is COMP:
+        return True
+    return cls._param_check(instance)
+
+def legacy_in_lazy(instance):
+    if not getattr(instance, "is_lazy", False):
+        return False
+    return getattr(instance, "_wrapped", None) is None
+
+def main(number=200_000):
+    typed_cod = COMP(cod=Jinja)
+    cases = (
+        ("x in COMP", lambda: legacy_in(eager, COMP), lambda: eager in COMP),
+        ("x in COMP(cod=Jinja)", lambda: legacy_in(eager, typed_cod), lambda: eager in typed_cod),
+        ("x in LAZY_COMP", lambda: legacy_in_lazy(lazy), lambda: lazy in LAZY_COMP),
+        ("str in COMP", lambda: legacy_in("jinja", COMP), lambda: "jinja" in COMP),
+    )
+    print(f"{'check':>22} {'before (ns)':>12} {'after (ns)':>11} {'speedup':>9}")
+    for label, before, after in cases:
+        b = min(timeit.repeat(before, number=number, repeat=3)) / number
+        a = min(timeit.repeat(after, number=number, repeat=3)) / number
+        print(f"{label:>22} {b * 1e9:>12.1f} {a * 1e9:>11.1f} {b / a:>8.2f}x")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,55 @@
+"""
+Render time of unordered / ordered / nav lists from 10 to 100k items,
+comparing the batched item path with the per-item component loop.
+
+    python benchmarks/list_items.py [max_items] [max_loop_items]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comp.comps import lists
+from comp.models import Item, NavItem, Unordered, Ordered, Nav, Link
+
+def unordered_of(n):
+    return lists.unordered, Unordered(ul_items=[Item(item_inner=f"item {i}") for i in range(n)])
+
+def ordered_of(n):
+    return lists.ordered, Ordered(ol_items=[Item(item_inner=f"item {i}") for i in range(n)])
+
+def nav_of(n):
+    items = [
+        NavItem(item_link=Link(link_href=f"/page/{i}", link_inner=f"page {i}"))
+        for i in range(n)
+    ]
+    return lists.nav, Nav(nav_items=items)
+
+def timed(component, model):
+    start = time.perf_counter()
+    component(model)
+    return time.perf_counter() - start
+
+def looped(component, model):
+    batched = lists._items_html
+    lists._items_html = lambda *args, **kwargs: None
+    try:
+        return timed(component, model)
+    finally:
+        lists._items_html = batched
+
+def main(max_items=100_000, max_loop_items=10_000):
+    print(f"{'list':>10} {'items':>8} {'batched (ms)':>14} {'loop (ms)':>12}")
+    for label, build in (("unordered", unordered_of), ("ordered", ordered_of), ("nav", nav_of)):
+        n = 10
+        while n <= max_items:
+            component, model = build(n)
+            component(model)
+            batched = timed(component, model)
+            loop = f"{looped(component, model) * 1e3:>12.2f}" if n <= max_loop_items else f"{'-':>12}"
+            print(f"{label:>10} {n:>8} {batched * 1e3:>14.2f} {loop}")
+            n *= 10
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,46 @@
+"""
+Render time of a chain of nested components as the nesting depth grows.
+
+Each level wraps the already rendered child, so with verbatim fragment
+embedding the time per level should stay flat (linear total time).
+
+    python benchmarks/render_depth.py [max_depth] [repeat]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from typed import Str, Int
+from comp import comp, render, Jinja, Inner
+
+@comp(fold=False)
+def leaf(text: Str="leaf") -> Jinja:
+    return """jinja
+<span>[[ text ]]</span>
+"""
+
+@comp(fold=False)
+def box(level: Int=0, inner: Inner="") -> Jinja:
+    return f"""jinja
+<div data-level="[[ level ]]">{inner}</div>
+"""
+
+def nested(depth):
+    html = leaf(text="x" * 64)
+    for level in range(depth):
+        html = box(level=level, inner=html)
+    return render(html, __styled__=False)
+
+def main(max_depth=1280, repeat=5):
+    nested(8)
+    print(f"{'depth':>8} {'total (ms)':>12} {'per level (us)':>16}")
+    depth = 10
+    while depth <= max_depth:
+        best = min(timeit.repeat(lambda: nested(depth), number=1, repeat=repeat))
+        print(f"{depth:>8} {best * 1e3:>12.3f} {best / depth * 1e6:>16.2f}")
+        depth *= 2
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,50 @@
+"""
+Cost of per-call typed validation, measured on a small component tree
+rendered with full checks, in trusted mode, and in trusted mode that
+still validates one call in N.
+
+    python benchmarks/trusted_mode.py [sections] [number] [sample]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from comp import render, trusted
+from comp.comps import div, text, link
+from comp.models import Div, Text, Link
+
+def page(sections):
+    parts = []
+    for i in range(sections):
+        parts.append(div(Div(
+            div_id=f"section-{i}",
+            div_class="section",
+            div_inner=text(Text(text_inner=f"Section {i}")),
+        )))
+        parts.append(link(Link(link_href=f"/section/{i}", link_inner=f"more {i}")))
+    return render(div(Div(div_inner="".join(f"{part}" for part in parts))), __styled__=False)
+
+def measure(sections, number, scope=None):
+    def run():
+        if scope is None:
+            return page(sections)
+        with scope():
+            return page(sections)
+    return min(timeit.repeat(run, number=number, repeat=3)) / number
+
+def main(sections=50, number=20, sample=10):
+    page(2)
+    checked = measure(sections, number)
+    rows = (
+        ("checked", checked),
+        ("trusted", measure(sections, number, lambda: trusted())),
+        (f"trusted 1/{sample}", measure(sections, number, lambda: trusted(sample=sample))),
+    )
+    print(f"{'mode':>14} {'per page (ms)':>15} {'speedup':>9}")
+    for label, seconds in rows:
+        print(f"{label:>14} {seconds * 1e3:>15.3f} {checked / seconds:>8.2f}x")
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -14,9 +14,20 @@ __imports__ = {
     "join":      "comp.mods.operations",
     "eval":      "comp.mods.operations",
     "render":    "comp.mods.service",
+    "render_async": "comp.mods.service",
+    "render_stream": "comp.mods.service",
+    "render_to": "comp.mods.service",
     "mock":      "comp.mods.service",
     "preview":   "comp.mods.service",
-    "minify":    "comp.mods.service"
+    "minify":    "comp.mods.service",
+    "compile":   "comp.mods.compiler",
+    "library":   "comp.mods.compiler",
+    "cache_info":  "comp.mods.cache",
+    "cache_clear": "comp.mods.cache",
+    "bytecode_cache": "comp.mods.cache",
+    "fingerprint": "comp.mods.cache",
+    "invalidate": "comp.mods.cache",
+    "trusted":   "comp.mods.trust"
 }
 
 if lazy(__imports__):
@@ -25,4 +36,7 @@ if lazy(__imports__):
     from comp.mods.helper.types_ import COMP, LAZY_COMP
     from comp.mods.types.factories import Tag, TAG
     from comp.mods.operations import copy, concat, join, eval
-    from comp.mods.service import render, mock, preview, minify
+    from comp.mods.service import render, render_async, render_stream, render_to, mock, preview, minify
+    from comp.mods.compiler import compile, library
+    from comp.mods.cache import cache_info, cache_clear, bytecode_cache, fingerprint, invalidate
+    from comp.mods.trust import trusted
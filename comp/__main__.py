@@ -0,0 +1,28 @@
+import sys
+import argparse
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m comp")
+    sub = parser.add_subparsers(dest="command")
+
+    cache = sub.add_parser("cache", help="manage the persistent template bytecode cache")
+    cache_sub = cache.add_subparsers(dest="action")
+    prune = cache_sub.add_parser("prune", help="remove stale or incompatible bytecode entries")
+    prune.add_argument("--dir", default=None, help="cache directory (default: $COMP_BYTECODE_CACHE_DIR)")
+    prune.add_argument("--max-age", type=float, default=None, help="remove entries unused for more than this many days")
+
+    args = parser.parse_args(argv)
+    if args.command == "cache" and args.action == "prune":
+        from comp.mods.cache import prune_bytecode_cache
+        max_age = args.max_age * 86400 if args.max_age is not None else None
+        try:
+            removed = prune_bytecode_cache(args.dir, max_age=max_age)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"[comp] removed {removed} bytecode cache entr{'y' if removed == 1 else 'ies'}")
+        return 0
+    parser.print_help()
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,9 @@ from comp.mods.decorators import comp
 from comp.mods.types.base import Jinja, Inner
 from comp.mods.err import CompErr
 from comp.models.lists import Item, Unordered, Ordered, Nav
+from comp.models.content import Link
 from comp.comps.content import link
+from comp.mods.helper.helper import _jinja_env, _Fragment
 from comp.mods.helper.comps import (
     if_item,
     if_ul,
@@ -12,9 +14,53 @@ from comp.mods.helper.comps import (
     if_id,
     if_class,
     if_style,
+    if_link,
     _render_inner
 )
 
+def _is_static(string):
+    env = _jinja_env()
+    return not (
+        env.variable_start_string in string
+        or env.block_start_string in string
+        or env.comment_start_string in string
+    )
+
+def _inner_html(inner):
+    rendered = _render_inner(inner)
+    if isinstance(rendered, _Fragment):
+        return rendered.html
+    rendered = str(rendered)
+    return rendered if _is_static(rendered) else None
+
+def _link_html(link_model, serialize):
+    if link_model is None:
+        link_model = Link()
+    inner = _inner_html(link_model.link_inner) if link_model.link_inner else ""
+    attrs = serialize(link_model)
+    if inner is None or not _is_static(attrs):
+        return None
+    return f"<a{attrs}>{inner}</a>"
+
+def _items_html(items, indent, with_link=False):
+    if items is None:
+        return None
+    serialize_item = getattr(if_item, "func", if_item)
+    serialize_link = getattr(if_link, "func", if_link)
+    parts = []
+    for i in items:
+        if i.item_inner:
+            inner = _inner_html(i.item_inner)
+        elif with_link:
+            inner = _link_html(getattr(i, "item_link", None), serialize_link)
+        else:
+            inner = ""
+        attrs = serialize_item(i)
+        if inner is None or not _is_static(attrs):
+            return None
+        parts.append(f"{indent}<li{attrs}>{inner}</li>")
+    return _Fragment("".join(parts))
+
 @comp
 def item(item: Maybe(Item)=None, inner: Inner="") -> Jinja:
     try:
@@ -38,6 +84,12 @@ def unordered(ul: Maybe(Unordered)=None, __context__={"item": item}) -> Jinja:
     try:
         if ul is None:
             ul = Unordered()
+        items = _items_html(getattr(ul, "ul_items", None), "\n    ")
+        if items is not None:
+            return f"""jinja
+<ul{ if_ul(ul) }>{ items }
+</ul>
+"""
         return f"""jinja
 <ul{ if_ul(ul) }>[% if ul.ul_items is defined %][% for i in ul.ul_items %]
     [[ item(item=i) ]][% endfor %]
@@ -52,6 +104,12 @@ def ordered(ol: Maybe(Ordered)=None, __context__={"item": item}) -> Jinja:
     try:
         if ol is None:
             ol = Ordered()
+        items = _items_html(getattr(ol, "ol_items", None), "\n    ")
+        if items is not None:
+            return f"""jinja
+<ol{ if_ol(ol) }>{ items }
+</ol>
+"""
         return f"""jinja
 <ol{ if_ol(ol) }>[% if ol.ol_items is defined %][% for i in ol.ol_items %]
     [[ item(item=i) ]][% endfor %]
@@ -72,6 +130,14 @@ def nav(nav: Maybe(Nav)=None, __context__={"link": link, "item": item}) -> Jinja
         else:
             ul_style = f" style='display: flex; flex-direction: column; {nav.ul_style}'"
 
+        items = _items_html(getattr(nav, "nav_items", None), "\n        ", with_link=True)
+        if items is not None:
+            return f"""jinja
+<nav{ if_nav(nav) }>
+    <ul{ if_id(nav.ul_id) }{ if_class(nav.ul_class) }{ ul_style }>{ items }
+    </ul>
+</nav>
+"""
         return f"""jinja
 <nav{ if_nav(nav) }>[% if nav.nav_items is defined %]
     <ul{ if_id(nav.ul_id) }{ if_class(nav.ul_class) }{ ul_style }>[% for it in nav.nav_items %]
@@ -0,0 +1,48 @@
+from comp.mods.helper.cache import _CACHES
+
+def cache_info(name=None):
+    if name is not None:
+        if name not in _CACHES:
+            raise KeyError(f"Unknown cache '{name}'. Available caches: {', '.join(sorted(_CACHES))}")
+        return _CACHES[name].info()
+    return {key: cache.info() for key, cache in _CACHES.items()}
+
+def cache_clear(name=None):
+    if name is not None:
+        if name not in _CACHES:
+            raise KeyError(f"Unknown cache '{name}'. Available caches: {', '.join(sorted(_CACHES))}")
+        _CACHES[name].clear()
+        return
+    for cache in _CACHES.values():
+        cache.clear()
+
+def invalidate(comp=None, tag=None):
+    from comp.mods.helper.fragments import _fragment_cache
+    definer = None
+    if comp is not None:
+        state = getattr(comp, "__dict__", {})
+        definer = state.get("_definer") or state.get("_orig")
+        if definer is None:
+            raise TypeError(f"Cannot invalidate cached fragments of '{comp}': not a component")
+    return _fragment_cache.invalidate(definer, tag)
+
+def fingerprint(value):
+    from comp.mods.helper.fingerprint import _fingerprint
+    return _fingerprint(value)
+
+def bytecode_cache(directory=None):
+    from comp.mods.helper.helper import _set_bytecode_cache
+    _set_bytecode_cache(directory)
+
+def prune_bytecode_cache(directory=None, max_age=None):
+    import os
+    from comp.mods.helper import helper
+    from comp.mods.helper.bytecode import _prune_bytecode
+    if directory is None:
+        if helper._bytecode_cache is not None:
+            directory = helper._bytecode_cache.directory
+        else:
+            directory = os.environ.get("COMP_BYTECODE_CACHE_DIR", "")
+    if not directory:
+        raise ValueError("No bytecode cache directory given and COMP_BYTECODE_CACHE_DIR is not set")
+    return _prune_bytecode(os.path.abspath(os.path.expanduser(directory)), max_age=max_age)
@@ -0,0 +1,188 @@
+from inspect import signature, Parameter, iscoroutinefunction
+from typed import Union, TYPE, name
+from comp.mods.helper.types_ import COMP, LAZY_COMP
+from comp.mods.helper.trust import _is_trusted
+from comp.mods.helper.helper import (
+    _jinja_env,
+    _jinja_template,
+    _strip_header,
+    _call_definer,
+    _render_definer,
+    _template_free_vars,
+    _pruned_context,
+    _Fragment
+)
+from comp.mods.helper.fold import _fold_cache, _fold_key
+from comp.mods.helper.fragments import _cached_call
+from comp.mods.err import CompileErr
+
+_MAX_LOCAL_TEMPLATES = 64
+
+def _check_comp(entity, operation):
+    if not entity in Union(COMP, LAZY_COMP):
+        raise TypeError(
+            f"{operation} expects a component:\n"
+            f" ==> '{entity}' has wrong type\n"
+             "     [expected_type] COMP or LAZY_COMP"
+        )
+
+def _check_domain(definer, domain, arguments):
+    for arg_name, annotation in domain:
+        value = arguments[arg_name]
+        if not value in annotation:
+            raise TypeError(
+                f"Wrong type in function '{name(definer)}':\n"
+                f" ==> '{arg_name}': has wrong type\n"
+                f"     [expected_type] {name(annotation)}\n"
+                f"     [received_type] {name(TYPE(value))}"
+            )
+
+def _check_codomain(definer, codomain, result):
+    if codomain is not None and not result in codomain:
+        raise TypeError(
+            f"Wrong type in codomain of '{name(definer)}':\n"
+            f" ==> returned value has wrong type\n"
+            f"     [expected_type] {name(codomain)}\n"
+            f"     [received_type] {name(TYPE(result))}"
+        )
+
+def compile(entity):
+    try:
+        _check_comp(entity, "compile")
+        return _compile(entity)
+    except CompileErr:
+        raise
+    except Exception as e:
+        raise CompileErr(e)
+
+def _compile(entity, namespace=None):
+    if getattr(entity, "is_lazy", False):
+        entity = entity._materialize()
+
+    definer = getattr(entity, "_definer", None)
+    if definer is None or iscoroutinefunction(definer):
+        return entity
+
+    params = list(signature(definer).parameters.values())
+    if any(p.kind not in (Parameter.POSITIONAL_OR_KEYWORD, Parameter.KEYWORD_ONLY) for p in params):
+        return entity
+
+    names = tuple(p.name for p in params)
+    positional = tuple(p.name for p in params if p.kind == Parameter.POSITIONAL_OR_KEYWORD)
+    accepted = frozenset(names)
+    defaults = {p.name: p.default for p in params if p.default is not Parameter.empty}
+    required = frozenset(names) - frozenset(defaults)
+    domain = tuple((p.name, p.annotation) for p in params if p.annotation is not Parameter.empty)
+    codomain = getattr(entity, "codomain", None)
+    templates = {}
+    compact = entity.__dict__.get("_compact", False)
+    policy = entity.__dict__.get("_cache_policy")
+    fold = entity.__dict__.get("_fold", False)
+
+    def run(*args, **kwargs):
+        if len(args) > len(positional) or not accepted.issuperset(kwargs):
+            return entity(*args, **kwargs)
+        arguments = dict(defaults)
+        for key, value in zip(positional, args):
+            if key in kwargs:
+                return entity(*args, **kwargs)
+            arguments[key] = value
+        arguments.update(kwargs)
+        if not required.issubset(arguments):
+            return entity(*args, **kwargs)
+
+        checked = not _is_trusted()
+        if checked:
+            _check_domain(definer, domain, arguments)
+
+        jinja_str, slots = _call_definer(definer, (), arguments)
+        if isinstance(jinja_str, _Fragment):
+            result = jinja_str
+        else:
+            env = _jinja_env()
+            key = (env, jinja_str)
+            cached = templates.get(key)
+            if cached is None:
+                source = _strip_header(jinja_str)
+                cached = (_jinja_template(source, env, compact), _template_free_vars(source, env))
+                if len(templates) < _MAX_LOCAL_TEMPLATES:
+                    templates[key] = cached
+            template, names = cached
+
+            context = _pruned_context(names, arguments, slots)
+            if namespace and arguments.get('__context__'):
+                for key in arguments['__context__']:
+                    if key in namespace and key in names:
+                        context[key] = namespace[key]
+            result = _render_definer(template, context)
+
+        if checked:
+            _check_codomain(definer, codomain, result)
+        return result
+
+    def compiled(*args, **kwargs):
+        if "__cache__" in kwargs:
+            return entity(*args, **kwargs)
+        if policy is not None:
+            return _cached_call(entity, run, policy, args, kwargs)
+        if not fold:
+            return run(*args, **kwargs)
+        key = _fold_key(definer, args, kwargs)
+        if key is None:
+            return run(*args, **kwargs)
+        result = _fold_cache.get(key)
+        if result is None:
+            result = run(*args, **kwargs)
+            if isinstance(result, _Fragment):
+                _fold_cache.set(key, result)
+        return result
+
+    compiled.__name__ = getattr(definer, "__name__", "compiled")
+    compiled.__qualname__ = getattr(definer, "__qualname__", compiled.__name__)
+    compiled.__doc__ = getattr(definer, "__doc__", None)
+    compiled.__wrapped__ = entity
+    compiled.comp = entity
+    return compiled
+
+class _Library:
+    def __init__(self, comps):
+        self._comps = {}
+        self._compiled = {}
+        for comp_name, entity in comps.items():
+            self._comps[comp_name] = entity
+            self._compiled[comp_name] = _compile(entity, self._compiled)
+
+    def __getattr__(self, comp_name):
+        try:
+            return self.__dict__["_compiled"][comp_name]
+        except KeyError:
+            raise AttributeError(f"Library has no component '{comp_name}'")
+
+    def __getitem__(self, comp_name):
+        return self._compiled[comp_name]
+
+    def __contains__(self, comp_name):
+        return comp_name in self._compiled
+
+    def __iter__(self):
+        return iter(self._compiled)
+
+    def __repr__(self):
+        return f"<Library {', '.join(self._compiled)}>"
+
+def library(*comps, **named_comps):
+    try:
+        entries = {}
+        for entity in comps:
+            _check_comp(entity, "library")
+            entries[getattr(entity, "__name__", None) or repr(entity)] = entity
+        for comp_name, entity in named_comps.items():
+            _check_comp(entity, "library")
+            entries[comp_name] = entity
+        if not entries:
+            raise ValueError("At least one comp must be provided")
+        return _Library(entries)
+    except CompileErr:
+        raise
+    except Exception as e:
+        raise CompileErr(e)
@@ -1,11 +1,27 @@
-import re
-from inspect import signature, Parameter
+from inspect import signature, Parameter, iscoroutinefunction
 from functools import wraps
 from typed import TYPE, name, typed, Dict, Lazy, Typed, Any, Union, Str
 from comp.mods.helper.types_ import COMP
-from comp.mods.helper.helper import _jinja, _jinja_env
+from comp.mods.helper.helper import (
+    _jinja,
+    _jinja_template,
+    _strip_header,
+    _call_definer,
+    _render_definer,
+    _acall_definer,
+    _arender_definer,
+    _jinja_async_env,
+    _template_free_vars,
+    _pruned_context,
+    _COMPACT,
+    _Fragment
+)
+from comp.mods.helper.fold import _is_foldable, _FOLDING
+from comp.mods.helper.fragments import _cache_policy
 from comp.mods.types.base import Jinja
 
+_MAX_DEPENDENCIES = 64
+
 @typed
 def jinja(arg: Union(Typed(Any, cod=Str), Lazy, Str)) -> Jinja:
     if arg in Str:
@@ -15,7 +31,12 @@ def jinja(arg: Union(Typed(Any, cod=Str), Lazy, Str)) -> Jinja:
             return arg
 
 
-def comp(arg=None, *, lazy=True):
+def comp(arg=None, *, lazy=True, fold=None, compact=None, cache=None):
+    if fold is None:
+        fold = _FOLDING
+    if compact is None:
+        compact = _COMPACT
+    cache_policy = _cache_policy(cache)
     def _build_comp(func):
         from typed import Function
         if not func in Function:
@@ -54,6 +75,10 @@ def comp(arg=None, *, lazy=True):
             )
 
         func_sig = signature(func)
+        dependencies = {}
+
+        if iscoroutinefunction(func):
+            return _build_async_comp(func, func_sig, typed_arg.codomain, dependencies)
 
         @wraps(func)
         def comp_wrapper(*args, **kwargs):
@@ -63,28 +88,83 @@ def comp(arg=None, *, lazy=True):
                 if len(args) <= context_index and '__context__' not in kwargs:
                     kwargs['__context__'] = {}
 
-            jinja_str = func(*args, **kwargs)
+            jinja_str, slots = _call_definer(func, args, kwargs)
+            if isinstance(jinja_str, _Fragment):
+                return jinja_str
 
             bound = func_sig.bind(*args, **kwargs)
             bound.apply_defaults()
-            context = dict(bound.arguments)
-            if '__context__' in context and context['__context__']:
-                context.update(context['__context__'])
+            source = _strip_header(jinja_str)
+            names = _template_free_vars(source)
+            if source not in dependencies and len(dependencies) < _MAX_DEPENDENCIES:
+                dependencies[source] = names
+            context = _pruned_context(names, bound.arguments, slots)
 
-            jinja_src = re.sub(r"^jinja\s*\n?", "", jinja_str)
-            template = _jinja_env().from_string(jinja_src)
-            rendered = template.render(**context)
-            return _jinja(rendered)
+            template = _jinja_template(source, compact=compact)
+            return _render_definer(template, context)
 
         typed_wrapper = typed(comp_wrapper, lazy=False)
         typed_wrapper.__class__ = COMP
+        typed_wrapper._definer = func
+        typed_wrapper._dependencies = dependencies
+        typed_wrapper._compact = compact
+        typed_wrapper._cache_policy = cache_policy
+        typed_wrapper._fold = fold and _is_foldable(func)
+        return typed_wrapper
+
+    def _build_async_comp(func, func_sig, codomain, dependencies):
+        from comp.mods.helper.types_ import ASYNC_COMP
+
+        @wraps(func)
+        async def comp_wrapper(*args, **kwargs):
+            bound = func_sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            for arg_name, value in bound.arguments.items():
+                annotation = func_sig.parameters[arg_name].annotation
+                if annotation is not Parameter.empty and not value in annotation:
+                    raise TypeError(
+                        f"Wrong type in function '{name(func)}':\n"
+                        f" ==> '{arg_name}': has wrong type\n"
+                        f"     [expected_type] {name(annotation)}\n"
+                        f"     [received_type] {name(TYPE(value))}"
+                    )
+
+            jinja_str, slots = await _acall_definer(func, (), bound.arguments)
+            if not isinstance(jinja_str, _Fragment):
+                source = _strip_header(jinja_str)
+                names = _template_free_vars(source)
+                if source not in dependencies and len(dependencies) < _MAX_DEPENDENCIES:
+                    dependencies[source] = names
+                context = _pruned_context(names, bound.arguments, slots)
+                template = _jinja_template(source, _jinja_async_env(), compact)
+                jinja_str = await _arender_definer(template, context)
+
+            if not jinja_str in codomain:
+                raise TypeError(
+                    f"Wrong type in codomain of '{name(func)}':\n"
+                    f" ==> returned value has wrong type\n"
+                    f"     [expected_type] {name(codomain)}\n"
+                    f"     [received_type] {name(TYPE(jinja_str))}"
+                )
+            return jinja_str
+
+        typed_wrapper = typed(comp_wrapper, lazy=False)
+        typed_wrapper.__class__ = ASYNC_COMP
+        typed_wrapper._definer = func
+        typed_wrapper._dependencies = dependencies
+        typed_wrapper._compact = compact
         return typed_wrapper
 
     def _make_lazy_wrapper(func):
         from comp.mods.helper.types_ import LAZY_COMP
-        return type.__call__(LAZY_COMP, func)
+        return type.__call__(LAZY_COMP, func, fold=fold, compact=compact, cache=cache)
 
     def decorator(func):
+        if cache_policy is not None and iscoroutinefunction(func):
+            raise TypeError(
+                "Fragment caching is not supported for async comps:\n"
+                f" ==> '{name(func)}': is a coroutine function"
+            )
         if not lazy:
             return _build_comp(func)
         return _make_lazy_wrapper(func)
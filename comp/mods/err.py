@@ -9,3 +9,4 @@ class EvalErr(Exception): pass
 class CompErr(Exception): pass
 class HelperErr(Exception): pass
 class GridErr(Exception): pass
+class CompileErr(Exception): pass
@@ -0,0 +1,98 @@
+import os
+import time
+import fnmatch
+import hashlib
+import tempfile
+from jinja2.bccache import FileSystemBytecodeCache, Bucket, bc_magic
+
+_PATTERN = "__comp_%s.cache"
+
+def _env_key(env):
+    return repr((
+        env.block_start_string, env.block_end_string,
+        env.variable_start_string, env.variable_end_string,
+        env.comment_start_string, env.comment_end_string,
+        env.line_statement_prefix, env.line_comment_prefix,
+        env.trim_blocks, env.lstrip_blocks,
+        env.newline_sequence, env.keep_trailing_newline,
+        env.optimized, env.is_async,
+        tuple(sorted(env.extensions)),
+    ))
+
+class _BytecodeCache(FileSystemBytecodeCache):
+    def __init__(self, directory):
+        directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(directory, _PATTERN)
+
+    def get_source_bucket(self, env, source):
+        key = hashlib.sha256(
+            (_env_key(env) + "\0" + source).encode("utf-8")
+        ).hexdigest()
+        bucket = Bucket(env, key, self.get_source_checksum(source))
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is not None:
+            try:
+                os.utime(self._get_cache_filename(bucket))
+            except OSError:
+                pass
+
+    def dump_bytecode(self, bucket):
+        name = self._get_cache_filename(bucket)
+        fd, tmp = tempfile.mkstemp(
+            dir=self.directory,
+            prefix=os.path.basename(name),
+            suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                bucket.write_bytecode(f)
+            os.replace(tmp, name)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+def _compile_template(env, source):
+    bcc = env.bytecode_cache
+    if not isinstance(bcc, _BytecodeCache):
+        return env.from_string(source)
+    bucket = bcc.get_source_bucket(env, source)
+    code = bucket.code
+    if code is None:
+        code = env.compile(source)
+        bucket.code = code
+        bcc.set_bucket(bucket)
+    return env.template_class.from_code(env, code, env.make_globals(None), None)
+
+def _prune_bytecode(directory, max_age=None, tmp_age=3600):
+    now = time.time()
+    removed = 0
+    try:
+        entries = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        path = os.path.join(directory, entry)
+        stale = False
+        try:
+            mtime = os.path.getmtime(path)
+            if entry.startswith(_PATTERN.split("%s")[0]) and entry.endswith(".tmp"):
+                stale = now - mtime > tmp_age
+            elif fnmatch.fnmatch(entry, _PATTERN % "*"):
+                if max_age is not None and now - mtime > max_age:
+                    stale = True
+                else:
+                    with open(path, "rb") as f:
+                        stale = f.read(len(bc_magic)) != bc_magic
+            if stale:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,157 @@
+import os
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+_CACHES = {}
+
+def _cache_size(env_var, default):
+    v = os.environ.get(env_var, "")
+    if v:
+        try:
+            size = int(v)
+        except ValueError:
+            raise RuntimeError(f"{env_var} must be a non-negative integer")
+        if size < 0:
+            raise RuntimeError(f"{env_var} must be a non-negative integer")
+        return size
+    return default
+
+class _LRU:
+    def __init__(self, name, maxsize=1024):
+        self.name = name
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _CACHES[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, key, value):
+        if self.maxsize == 0:
+            return value
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+        return value
+
+    def setdefault(self, key, value):
+        if self.maxsize == 0:
+            return value
+        with self._lock:
+            current = self._data.get(key, _MISSING)
+            if current is not _MISSING:
+                self._data.move_to_end(key)
+                return current
+            self._data[key] = value
+            self._evict()
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_ratio": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+            }
+
+class _SizedLRU(_LRU):
+    def __init__(self, name, maxbytes, weigh=len):
+        super().__init__(name, maxbytes)
+        self.bytes = 0
+        self._weigh = weigh
+
+    def _evict(self):
+        while self.bytes > self.maxsize and self._data:
+            _, value = self._data.popitem(last=False)
+            self.bytes -= self._weigh(value)
+            self.evictions += 1
+
+    def set(self, key, value):
+        size = self._weigh(value)
+        if size > self.maxsize:
+            return value
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= self._weigh(previous)
+            self._data[key] = value
+            self.bytes += size
+            self._evict()
+        return value
+
+    def setdefault(self, key, value):
+        with self._lock:
+            current = self._data.get(key, _MISSING)
+            if current is not _MISSING:
+                self._data.move_to_end(key)
+                return current
+        return self.set(key, value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            value = self._data.pop(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self.bytes -= self._weigh(value)
+            return value
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+            self.bytes = 0
+
+    def info(self):
+        with self._lock:
+            info = super().info()
+            info["bytes"] = self.bytes
+            return info
+
+def _memo(cache, key, build):
+    try:
+        hash(key)
+    except TypeError:
+        return build()
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = cache.setdefault(key, build())
+    return value
@@ -1,4 +1,6 @@
-from typed import typed, Str, Any, Maybe
+from typed import Str, Any, Maybe
+from comp.mods.helper.trust import _typed
+from comp.mods.helper.helper import _without_headers
 from comp.mods.err import HelperErr
 from comp.models import (
     Div,
@@ -121,28 +123,28 @@ def if_globals(globals: Maybe(Globals)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_id(entry: Any=None) -> Str:
     try:
         return if_key(entry, "id")
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_class(entry: Any=None) -> Str:
     try:
         return if_key(entry, "class")
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_style(entry: Any=None) -> Str:
     try:
         return if_key(entry, "style")
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_div(div: Maybe(Div)=None) -> Str:
     try:
         if not div:
@@ -157,7 +159,7 @@ def if_div(div: Maybe(Div)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_alpine(alpine: Maybe(Alpine)=None) -> Str:
     try:
         if not alpine:
@@ -173,7 +175,7 @@ def if_alpine(alpine: Maybe(Alpine)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_header(header: Maybe(Header)=None) -> Str:
     try:
         if not header:
@@ -188,7 +190,7 @@ def if_header(header: Maybe(Header)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_aside(aside: Maybe(Aside)=None) -> Str:
     try:
         if not aside:
@@ -203,7 +205,7 @@ def if_aside(aside: Maybe(Aside)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_sidebar(sidebar: Maybe(Sidebar)=None) -> Str:
     try:
         if not sidebar:
@@ -218,7 +220,7 @@ def if_sidebar(sidebar: Maybe(Sidebar)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_footer(footer: Maybe(Footer)=None) -> Str:
     try:
         if not footer:
@@ -233,7 +235,7 @@ def if_footer(footer: Maybe(Footer)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_head(head: Maybe(Head)=None) -> Str:
     try:
         if not head:
@@ -245,7 +247,7 @@ def if_head(head: Maybe(Head)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_main(main: Maybe(Main)=None) -> Str:
     try:
         if not main:
@@ -260,7 +262,7 @@ def if_main(main: Maybe(Main)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_body(body: Maybe(Body)=None) -> Str:
     try:
         if not body:
@@ -272,14 +274,14 @@ def if_body(body: Maybe(Body)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_page(page: Maybe(Page)=None) -> Str:
     try:
         return ""
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_text(text: Maybe(Text)=None) -> Str:
     try:
         if not text:
@@ -294,7 +296,7 @@ def if_text(text: Maybe(Text)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_title(title: Maybe(Title)=None) -> Str:
     try:
         if not title:
@@ -309,7 +311,7 @@ def if_title(title: Maybe(Title)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_link(link: Maybe(Link)=None) -> Str:
     try:
         if not link:
@@ -328,7 +330,7 @@ def if_link(link: Maybe(Link)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_button(button: Maybe(Button)=None) -> Str:
     try:
         if not button:
@@ -345,7 +347,7 @@ def if_button(button: Maybe(Button)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_img(img: Maybe(Image)=None) -> Str:
     try:
         if not img:
@@ -363,7 +365,7 @@ def if_img(img: Maybe(Image)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_figure(figure: Maybe(Figure)=None) -> Str:
     try:
         if not figure:
@@ -375,7 +377,7 @@ def if_figure(figure: Maybe(Figure)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_script(script: Maybe(Script)=None) -> Str:
     try:
         if not script:
@@ -391,7 +393,7 @@ def if_script(script: Maybe(Script)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_asset(asset: Maybe(Asset)=None) -> Str:
     try:
         if not asset:
@@ -406,7 +408,7 @@ def if_asset(asset: Maybe(Asset)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_item(item: Maybe(Item)=None) -> Str:
     try:
         if not item:
@@ -421,7 +423,7 @@ def if_item(item: Maybe(Item)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_ul(ul: Maybe(Unordered)=None) -> Str:
     try:
         if not ul:
@@ -436,7 +438,7 @@ def if_ul(ul: Maybe(Unordered)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_ol(ol: Maybe(Ordered)=None) -> Str:
     try:
         if not ol:
@@ -451,7 +453,7 @@ def if_ol(ol: Maybe(Ordered)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_nav(nav: Maybe(Nav)=None) -> Str:
     try:
         if not nav:
@@ -466,7 +468,7 @@ def if_nav(nav: Maybe(Nav)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_icon(icon: Maybe(Icon)=None) -> Str:
     try:
         if not icon:
@@ -486,7 +488,7 @@ def if_icon(icon: Maybe(Icon)=None) -> Str:
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def if_input(input: Maybe(Input)=None) -> Str:
     try:
         if not input:
@@ -563,12 +565,12 @@ def _render_inner(obj):
         if type(obj) is Page:       return page(obj)
         if type(obj) is Aside:      return aside(obj)
         if type(obj) is Markdown:   return markdown(obj)
-        if isinstance(obj, str):    return obj
+        if isinstance(obj, str):    return _without_headers(obj)
         return str(obj)
     except Exception as e:
         raise HelperErr(e)
 
-@typed
+@_typed
 def _generate_meta_tags(meta: Maybe(Metadata)=None) -> Str:
     try:
         if meta is None:
@@ -0,0 +1,54 @@
+import os
+import mmap
+import threading
+from comp.mods.helper.cache import _SizedLRU, _cache_size
+
+_file_cache = _SizedLRU("files", _cache_size("COMP_FILE_CACHE_BYTES", 32 * 1024 * 1024))
+_MMAP_THRESHOLD = _cache_size("COMP_FILE_MMAP_THRESHOLD", 1024 * 1024)
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _read_text(path, size):
+    with open(path, "rb") as f:
+        if size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                with memoryview(m) as view:
+                    text = str(view, "utf-8")
+        else:
+            text = f.read().decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+def _inline_tag(path, tag):
+    try:
+        full = os.path.abspath(path)
+        st = os.stat(full)
+        key = (full, st.st_mtime_ns, st.st_size, tag)
+        html = _file_cache.get(key)
+        if html is not None:
+            return html
+
+        with _inflight_lock:
+            event = _inflight.get(key)
+            owner = event is None
+            if owner:
+                event = _inflight[key] = threading.Event()
+        if not owner:
+            event.wait()
+            html = _file_cache.get(key)
+            if html is not None:
+                return html
+
+        try:
+            html = f"<{tag}>{_read_text(full, st.st_size)}</{tag}>"
+            _file_cache.set(key, html)
+        finally:
+            if owner:
+                with _inflight_lock:
+                    _inflight.pop(key, None)
+                event.set()
+        return html
+    except Exception as e:
+        return f"<!-- [Could not read {path}: {e}] -->"
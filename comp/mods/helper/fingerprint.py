@@ -0,0 +1,193 @@
+import enum
+import uuid
+import hashlib
+import datetime
+import threading
+from decimal import Decimal
+from fractions import Fraction
+from pathlib import PurePath
+from itertools import count
+from collections.abc import Mapping
+from types import FunctionType, BuiltinFunctionType, MethodType, ModuleType, CodeType
+from comp.mods.helper.helper import _resolve_fragments
+
+_ATTR = "_comp_fingerprint"
+_HOOKS = ("__setattr__", "__delattr__", "__setitem__", "__delitem__")
+_MAPPING_HOOKS = ("update", "pop", "popitem", "clear", "setdefault", "__ior__")
+_MUTABLE = (list, dict, set, bytearray)
+_BY_REPR = (complex, Decimal, Fraction, datetime.date, datetime.time, datetime.timedelta, uuid.UUID, PurePath, enum.Enum)
+
+_generations = count(1)
+_generation = 0
+_watched = set()
+_watch_lock = threading.Lock()
+
+def _bump():
+    global _generation
+    _generation = next(_generations)
+
+def _is_model(value):
+    from typed.models import MODEL
+    try:
+        return isinstance(value, MODEL)
+    except Exception:
+        return False
+
+def _hooked(original):
+    def hook(self, *args, **kwargs):
+        state = getattr(self, "__dict__", None)
+        if state is not None and state.pop(_ATTR, None) is not None:
+            _bump()
+        return original(self, *args, **kwargs)
+    return hook
+
+def _watch(cls):
+    if cls in _watched:
+        return
+    with _watch_lock:
+        if cls in _watched:
+            return
+        hooks = _HOOKS + _MAPPING_HOOKS if issubclass(cls, Mapping) else _HOOKS
+        for hook_name in hooks:
+            original = getattr(cls, hook_name, None)
+            if original is None:
+                continue
+            try:
+                setattr(cls, hook_name, _hooked(original))
+            except TypeError:
+                pass
+        _watched.add(cls)
+
+def _qualname(value):
+    return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', getattr(value, '__name__', ''))}"
+
+def _digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part)
+    return h.digest()
+
+def _model_fields(value):
+    if isinstance(value, Mapping):
+        return value.items()
+    return ((k, v) for k, v in vars(value).items() if not k.startswith("_"))
+
+def _encode(value, stack):
+    if value is None:
+        return b"N", True
+    if value is True or value is False:
+        return (b"T" if value else b"F"), True
+    if isinstance(value, int):
+        return b"i" + str(int(value)).encode(), True
+    if isinstance(value, float):
+        return b"f" + float(value).hex().encode(), True
+    if isinstance(value, str):
+        resolved = _resolve_fragments(value)
+        data = resolved.encode("utf-8", "surrogatepass")
+        return b"s%d:" % len(data) + data, resolved is value
+    if isinstance(value, (bytes, bytearray)):
+        return b"b%d:" % len(value) + bytes(value), not isinstance(value, bytearray)
+    if isinstance(value, ModuleType):
+        return b"M" + value.__name__.encode(), True
+    if isinstance(value, BuiltinFunctionType) and isinstance(getattr(value, "__self__", None), (ModuleType, type(None))):
+        return b"c" + _qualname(value).encode(), True
+    if isinstance(value, type) and "<locals>" not in value.__qualname__:
+        return b"c" + _qualname(value).encode(), True
+
+    key = id(value)
+    if key in stack:
+        return b"@", True
+    stack.add(key)
+    try:
+        if isinstance(value, CodeType):
+            return _encode_code(value, stack)
+        if isinstance(value, FunctionType):
+            return _encode_function(value, stack)
+        if isinstance(value, (MethodType, BuiltinFunctionType)):
+            fields = (("self", value.__self__), ("func", getattr(value, "__func__", None)))
+            return _encode_fields(b"c" + _qualname(value).encode(), fields, stack, True)
+        if isinstance(value, type):
+            fields = [(k, v) for k, v in vars(value).items() if k == "__annotations__" or not k.startswith("__")]
+            return _encode_fields(b"k" + _qualname(value).encode(), fields, stack, True)
+        if getattr(type(value), "_comp_kind", None) is not None:
+            definer = value.__dict__.get("_definer") or value.__dict__.get("_orig")
+            if definer is None:
+                return b"c" + _qualname(type(value)).encode(), True
+            data, frozen = _encode(definer, stack)
+            return b"c" + data, frozen
+        if _is_model(value):
+            data, frozen = _model_fingerprint(value, stack)
+            return b"m" + data, frozen
+        if isinstance(value, (list, tuple)):
+            frozen = not isinstance(value, list)
+            parts = [b"l" if not frozen else b"t", b"%d:" % len(value)]
+            for item in value:
+                data, item_frozen = _encode(item, stack)
+                parts.append(_digest((data,)))
+                frozen = frozen and item_frozen
+            return _digest(parts), frozen
+        if isinstance(value, (set, frozenset)):
+            frozen = isinstance(value, frozenset)
+            items = []
+            for item in value:
+                data, item_frozen = _encode(item, stack)
+                items.append(_digest((data,)))
+                frozen = frozen and item_frozen
+            return _digest([b"S"] + sorted(items)), frozen
+        if isinstance(value, Mapping):
+            return _encode_fields(b"d", value.items(), stack, not isinstance(value, _MUTABLE))
+        if isinstance(value, _BY_REPR):
+            return b"r" + _qualname(type(value)).encode() + repr(value).encode("utf-8", "surrogatepass"), True
+        raise TypeError(f"Cannot fingerprint a value of type '{_qualname(type(value))}'")
+    finally:
+        stack.discard(key)
+
+def _encode_code(code, stack):
+    parts = [b"C", code.co_code, repr(code.co_names).encode()]
+    frozen = True
+    for const in code.co_consts:
+        data, const_frozen = _encode(const, stack)
+        parts.append(_digest((data,)))
+        frozen = frozen and const_frozen
+    return _digest(parts), frozen
+
+def _encode_function(func, stack):
+    cells = []
+    for cell in func.__closure__ or ():
+        try:
+            cells.append(cell.cell_contents)
+        except ValueError:
+            cells.append(None)
+    fields = (
+        ("code", func.__code__),
+        ("defaults", func.__defaults__),
+        ("kwdefaults", func.__kwdefaults__),
+        ("closure", tuple(cells)),
+    )
+    return _encode_fields(b"c" + _qualname(func).encode(), fields, stack, True)
+
+def _encode_fields(tag, fields, stack, frozen):
+    items = []
+    for k, v in fields:
+        kdata, kfrozen = _encode(k, stack)
+        vdata, vfrozen = _encode(v, stack)
+        items.append(_digest((kdata, b"=", vdata)))
+        frozen = frozen and kfrozen and vfrozen
+    return _digest([tag] + sorted(items)), frozen
+
+def _model_fingerprint(value, stack):
+    cls = type(value)
+    _watch(cls)
+    state = getattr(value, "__dict__", None)
+    cached = state.get(_ATTR) if state is not None else None
+    if cached is not None and cached[0] == _generation:
+        return cached[1], True
+    generation = _generation
+    data, frozen = _encode_fields(b"m" + _qualname(cls).encode(), _model_fields(value), stack, state is not None)
+    if frozen:
+        state[_ATTR] = (generation, data)
+    return data, frozen
+
+def _fingerprint(value):
+    data, _ = _encode(value, set())
+    return _digest((data,)).hex()
@@ -0,0 +1,150 @@
+import os
+import sys
+import dis
+import builtins
+import weakref
+from types import CodeType, ModuleType, FunctionType, BuiltinFunctionType, MethodType
+from inspect import signature, iscoroutinefunction, Parameter
+from comp.mods.helper.cache import _LRU, _cache_size
+from comp.mods.helper.helper import _resolve_fragments
+
+_fold_cache = _LRU("folds", _cache_size("COMP_FOLD_CACHE_SIZE", 4096))
+_FOLDING = os.environ.get("COMP_CONSTANT_FOLDING", "").lower() in ("1", "true", "yes", "on")
+
+_IMPURE_MODULES = frozenset({
+    "time", "random", "datetime", "uuid", "secrets", "os", "sys", "io", "pathlib",
+    "shutil", "glob", "tempfile", "subprocess", "socket", "urllib", "http", "utils",
+})
+_IMPURE_BUILTINS = frozenset({"open", "input", "id", "print", "globals", "locals", "vars", "exec", "eval"})
+_GLOBAL_WRITES = frozenset({"STORE_GLOBAL", "DELETE_GLOBAL"})
+_ATOMS = (str, int, float, bytes, type(None))
+
+_purity = weakref.WeakKeyDictionary()
+
+def _is_frozen(value):
+    if isinstance(value, _ATOMS):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_frozen(v) for v in value)
+    return False
+
+def _is_pure_module(name):
+    return (name or "").split(".")[0] not in _IMPURE_MODULES
+
+def _is_pure_ref(value, seen):
+    if _is_frozen(value):
+        return True
+    if isinstance(value, ModuleType):
+        return _is_pure_module(value.__name__)
+    if isinstance(value, type):
+        return _is_pure_module(value.__module__)
+    if isinstance(value, FunctionType):
+        return _is_pure_function(value, seen)
+    if isinstance(value, MethodType):
+        return _is_pure_ref(value.__func__, seen) and _is_pure_module(type(value.__self__).__module__)
+    if isinstance(value, BuiltinFunctionType):
+        owner = getattr(value, "__self__", None)
+        if isinstance(owner, ModuleType):
+            return _is_pure_module(owner.__name__)
+        if owner is not None and not isinstance(owner, type):
+            return _is_pure_module(type(owner).__module__)
+        return _is_pure_module(getattr(value, "__module__", None))
+    state = getattr(value, "__dict__", None) or {}
+    for attr in ("_definer", "_orig", "func"):
+        inner = state.get(attr)
+        if inner is not None and inner is not value:
+            return _is_pure_ref(inner, seen)
+    return False
+
+def _code_refs(code, names, imports):
+    module = None
+    for ins in dis.get_instructions(code):
+        if ins.opname in _GLOBAL_WRITES:
+            return False
+        if ins.opname in ("LOAD_GLOBAL", "LOAD_NAME"):
+            names.add(ins.argval)
+        elif ins.opname == "IMPORT_NAME":
+            module = ins.argval
+            imports.append((module, None))
+        elif ins.opname == "IMPORT_FROM":
+            imports.append((module, ins.argval))
+    for const in code.co_consts:
+        if isinstance(const, CodeType) and not _code_refs(const, names, imports):
+            return False
+    return True
+
+def _analyse(func, seen):
+    defaults = (func.__defaults__ or ()) + tuple((func.__kwdefaults__ or {}).values())
+    if not all(_is_frozen(value) for value in defaults):
+        return False
+    for cell in func.__closure__ or ():
+        try:
+            if not _is_pure_ref(cell.cell_contents, seen):
+                return False
+        except ValueError:
+            return False
+    names, imports = set(), []
+    if not _code_refs(func.__code__, names, imports):
+        return False
+    scope = func.__globals__
+    for ref in names:
+        if ref in scope:
+            if not _is_pure_ref(scope[ref], seen):
+                return False
+        elif ref in _IMPURE_BUILTINS and hasattr(builtins, ref):
+            return False
+    for module, attr in imports:
+        if not _is_pure_module(module):
+            return False
+        if attr is not None:
+            value = getattr(sys.modules.get(module), attr, None)
+            if value is None or not _is_pure_ref(value, seen):
+                return False
+    return True
+
+def _is_pure_function(func, seen):
+    verdict = _purity.get(func)
+    if verdict is not None:
+        return verdict
+    if func in seen:
+        return True
+    seen.add(func)
+    return _analyse(func, seen)
+
+def _is_pure(func):
+    seen = set()
+    verdict = _is_pure_function(func, seen)
+    if verdict:
+        for checked in seen:
+            _purity[checked] = True
+    else:
+        _purity[func] = False
+    return verdict
+
+def _is_foldable(func):
+    if iscoroutinefunction(func) or getattr(func, "__code__", None) is None:
+        return False
+    kinds = (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD)
+    if any(p.kind in kinds for p in signature(func).parameters.values()):
+        return False
+    return _is_pure(func)
+
+def _key_atom(value):
+    if isinstance(value, str):
+        return _resolve_fragments(value)
+    if isinstance(value, tuple):
+        return tuple(_key_atom(v) for v in value)
+    if isinstance(value, frozenset):
+        return frozenset(_key_atom(v) for v in value)
+    return value
+
+def _fold_key(definer, args, kwargs):
+    if not all(_is_frozen(a) for a in args):
+        return None
+    if not all(_is_frozen(v) for v in kwargs.values()):
+        return None
+    return (
+        definer,
+        tuple((type(a), _key_atom(a)) for a in args),
+        tuple(sorted((k, type(v), _key_atom(v)) for k, v in kwargs.items())),
+    )
@@ -0,0 +1,100 @@
+import time
+from comp.mods.helper.cache import _SizedLRU, _cache_size, _MISSING
+from comp.mods.helper.fingerprint import _fingerprint, _qualname
+from comp.mods.helper.helper import _Fragment
+
+def _cache_policy(spec):
+    if spec is None or spec is False:
+        return None
+    if spec is True:
+        return (None, ())
+    if isinstance(spec, (int, float)) and not isinstance(spec, bool):
+        if spec <= 0:
+            raise ValueError("cache TTL must be a positive number of seconds")
+        return (float(spec), ())
+    if isinstance(spec, dict):
+        unknown = set(spec) - {"ttl", "tags"}
+        if unknown:
+            raise TypeError(f"Unknown cache option(s): {', '.join(sorted(unknown))}")
+        ttl = spec.get("ttl")
+        if ttl is not None:
+            ttl = _cache_policy(ttl)[0]
+        tags = spec.get("tags", ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        return (ttl, frozenset(tags))
+    raise TypeError("cache must be True, a TTL in seconds or a dict with 'ttl' and/or 'tags'")
+
+def _weigh(entry):
+    return len(entry[0])
+
+class _FragmentCache(_SizedLRU):
+    def __init__(self, name, maxbytes):
+        super().__init__(name, maxbytes, _weigh)
+        self.stats = {}
+
+    def lookup(self, key):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                self.bytes -= _weigh(entry)
+                entry = _MISSING
+            stats = self.stats.get(key[0])
+            if stats is None:
+                stats = self.stats[key[0]] = [0, 0]
+            if entry is _MISSING:
+                self.misses += 1
+                stats[1] += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            stats[0] += 1
+            return entry[0]
+
+    def store(self, key, fragment, policy):
+        ttl, tags = policy
+        expires = None if ttl is None else time.monotonic() + ttl
+        self.set(key, (fragment, expires, tags))
+
+    def invalidate(self, definer=None, tag=None):
+        with self._lock:
+            doomed = [
+                key for key, entry in self._data.items()
+                if (definer is None or key[0] is definer) and (tag is None or tag in entry[2])
+            ]
+            for key in doomed:
+                self.bytes -= _weigh(self._data.pop(key))
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+            self.stats.clear()
+
+    def info(self):
+        with self._lock:
+            info = super().info()
+            info["components"] = {
+                _qualname(definer): {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                }
+                for definer, (hits, misses) in self.stats.items()
+            }
+            return info
+
+_fragment_cache = _FragmentCache("fragments", _cache_size("COMP_FRAGMENT_CACHE_BYTES", 64 * 1024 * 1024))
+
+def _cached_call(comp, call, policy, args, kwargs):
+    try:
+        key = (comp._definer, _fingerprint((args, kwargs)))
+    except Exception:
+        return call(*args, **kwargs)
+    result = _fragment_cache.lookup(key)
+    if result is None:
+        result = call(*args, **kwargs)
+        if isinstance(result, _Fragment):
+            _fragment_cache.store(key, result, policy)
+    return result
@@ -1,6 +1,12 @@
 import re
 import os
+import hashlib
+import weakref
+import threading
+from functools import lru_cache
+from contextvars import ContextVar
 from jinja2 import meta
+from comp.mods.helper.cache import _LRU, _CACHES, _cache_size
 
 _VAR_DELIM = {
     ("[[", "]]"),
@@ -51,6 +57,8 @@ _jinja_delim = dict(_JINJA_DELIM)
 
 def _set_jinja_delim(**kwargs):
     _jinja_delim.update(kwargs)
+    _jinja_verdicts.clear()
+    _reset_envs()
 
 _JINJA_ENV_CLS = None
 _JINJA_META = None
@@ -62,39 +70,373 @@ def _ensure_jinja():
        from jinja2 import Environment, meta, StrictUndefined
        _JINJA_ENV_CLS, _JINJA_META, _JINJA_STRICT = Environment, meta, StrictUndefined
 
-_env_cache = None
+_env_lock = threading.Lock()
+_env_registry = {}
+_env_local = threading.local()
+_env_generation = 0
+_all_envs = weakref.WeakSet()
+_default_env = None
+_bytecode_cache = None
+_env_per_thread = os.environ.get("COMP_JINJA_ENV_PER_THREAD", "").lower() in ("1", "true", "yes", "on")
+_ENV_BOUND_CACHES = ("folds", "fragments")
+
+def _reset_envs():
+    global _env_generation, _default_env
+    with _env_lock:
+        _env_generation += 1
+        _env_registry.clear()
+        _compact_envs.clear()
+        _default_env = None
+    _template_cache.clear()
+    _template_vars.clear()
+    for name in _ENV_BOUND_CACHES:
+        cache = _CACHES.get(name)
+        if cache is not None:
+            cache.clear()
+
+def _set_env_per_thread(flag=True):
+    global _env_per_thread
+    _env_per_thread = bool(flag)
+    _reset_envs()
+
+def _set_bytecode_cache(directory=None):
+    global _bytecode_cache
+    if directory:
+        from comp.mods.helper.bytecode import _BytecodeCache
+        _bytecode_cache = _BytecodeCache(directory)
+    else:
+        _bytecode_cache = None
+    with _env_lock:
+        for env in list(_all_envs):
+            env.bytecode_cache = _bytecode_cache
+    _template_cache.clear()
+    return _bytecode_cache
+
+def _env_options_key(options):
+    items = []
+    for k, v in sorted(options.items()):
+        if isinstance(v, (list, tuple, set, frozenset)):
+            v = tuple(sorted(v, key=repr)) if isinstance(v, (set, frozenset)) else tuple(v)
+        items.append((k, v))
+    key = tuple(items)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+def _env_store():
+    if not _env_per_thread:
+        return _env_registry
+    store = getattr(_env_local, "store", None)
+    if store is None or store[0] != _env_generation:
+        store = _env_local.store = (_env_generation, {})
+    return store[1]
 
 def _jinja_env(undefined=None, **kwargs):
-    global _env_cache
+    global _default_env
+    default = undefined is None and not kwargs
+    if default and not _env_per_thread and _default_env is not None:
+        return _default_env
     _ensure_jinja()
     if undefined is None:
         undefined = _JINJA_STRICT
-    if _env_cache is None and not kwargs:
-        _env_cache = _JINJA_ENV_CLS(undefined=undefined, **_jinja_delim)
-    if not kwargs:
-        return _env_cache
-    params = {"undefined": undefined, **_jinja_delim, **kwargs}
-    return _JINJA_ENV_CLS(**params)
+    options = {"undefined": undefined, **_jinja_delim, **kwargs}
+    key = _env_options_key(options)
+    store = _env_store()
+    env = store.get(key) if key is not None else None
+    if env is None:
+        with _env_lock:
+            env = store.get(key) if key is not None else None
+            if env is None:
+                env = _JINJA_ENV_CLS(finalize=_finalize, bytecode_cache=_bytecode_cache, **options)
+                _all_envs.add(env)
+                if key is not None:
+                    store[key] = env
+            if default and not _env_per_thread:
+                _default_env = env
+    return env
+
+_template_cache = _LRU("templates", _cache_size("COMP_TEMPLATE_CACHE_SIZE", 2048))
+
+if os.environ.get("COMP_BYTECODE_CACHE_DIR", ""):
+    _set_bytecode_cache(os.environ["COMP_BYTECODE_CACHE_DIR"])
+
+_COMPACT = os.environ.get("COMP_COMPACT_TEMPLATES", "").lower() in ("1", "true", "yes", "on")
+_PROTECTED_RE = re.compile(r"(<(pre|textarea|script)\b[^>]*>.*?</\2\s*>)", re.IGNORECASE | re.DOTALL)
+_INDENT_RE = re.compile(r"[ \t\r\f\v]*\n\s*")
+_compact_envs = weakref.WeakKeyDictionary()
+
+def _compact_source(source):
+    parts = _PROTECTED_RE.split(source)
+    out = []
+    for i in range(0, len(parts), 3):
+        out.append(_INDENT_RE.sub("\n", parts[i]))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return "".join(out).strip()
+
+def _compact_env(env):
+    compact = _compact_envs.get(env)
+    if compact is None:
+        options = {"trim_blocks": True, "lstrip_blocks": True}
+        if env.is_async:
+            options["enable_async"] = True
+        compact = _jinja_env(**options)
+        with _env_lock:
+            compact = _compact_envs.setdefault(env, compact)
+    return compact
+
+def _jinja_template(source, env=None, compact=False):
+    if env is None:
+        env = _jinja_env()
+    if compact:
+        env = _compact_env(env)
+    key = (env, source)
+    template = _template_cache.get(key)
+    if template is None:
+        from comp.mods.helper.bytecode import _compile_template
+        compiled = _compile_template(env, _compact_source(source) if compact else source)
+        template = _template_cache.set(key, compiled)
+    return template
+
+_template_vars = _LRU("template_vars", _cache_size("COMP_TEMPLATE_VARS_CACHE_SIZE", 2048))
+
+def _template_free_vars(source, env=None):
+    if env is None:
+        env = _jinja_env()
+    key = (env, source)
+    names = _template_vars.get(key)
+    if names is None:
+        names = frozenset(meta.find_undeclared_variables(env.parse(source)))
+        names = _template_vars.set(key, names)
+    return names
+
+def _pruned_context(names, arguments, slots=None):
+    extra = arguments.get("__context__") or {}
+    context = {}
+    for var in names:
+        if var in extra:
+            context[var] = extra[var]
+        elif var in arguments:
+            context[var] = arguments[var]
+        elif slots is not None and var.startswith(_SLOT_PREFIX):
+            html = slots.lookup(var)
+            if html is not None:
+                context[var] = html
+    return context
+
+def _jinja_async_env():
+    return _jinja_env(enable_async=True)
 
 def _jinja_regex(tag_name=""):
     if tag_name:
         return rf"^jinja\s*\n?\s*<{tag_name}\b[^>]*>(.*?)</{tag_name}>\s*$"
     return r"^jinja\s*\n?\s*(.*?)\s*$"
 
+_JINJA_RE = re.compile(_jinja_regex(), re.DOTALL)
+
+@lru_cache(maxsize=128)
+def _jinja_pattern(tag_name=""):
+    if not tag_name:
+        return _JINJA_RE
+    return re.compile(_jinja_regex(tag_name), re.DOTALL)
+
 def _is_jinja(jinja_string, tag_name=""):
-    pattern = _jinja_regex(tag_name)
-    regex = re.compile(pattern, re.DOTALL)
-    return regex.match(jinja_string) is not None
+    if not tag_name and isinstance(jinja_string, _JinjaStr):
+        return True
+    return _jinja_pattern(tag_name).match(jinja_string) is not None
+
+_jinja_verdicts = _LRU("jinja_verdicts", _cache_size("COMP_JINJA_VERDICT_CACHE_SIZE", 4096))
+
+def _parses(jinja_src):
+    try:
+        _jinja_env().parse(jinja_src)
+        return True
+    except Exception:
+        return False
+
+def _verdict_key(jinja_string):
+    data = jinja_string.encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def _is_valid_jinja(jinja_string):
+    if isinstance(jinja_string, _Fragment):
+        return True
+    if isinstance(jinja_string, _JinjaStr):
+        env = _jinja_env()
+        cached = jinja_string.__dict__.get("_valid")
+        if cached is None or cached[0] is not env:
+            cached = jinja_string._valid = (env, _parses(jinja_string.body))
+        return cached[1]
+    key = _verdict_key(jinja_string)
+    verdict = _jinja_verdicts.get(key)
+    if verdict is not None:
+        return verdict
+    match = _JINJA_RE.match(jinja_string)
+    verdict = match is not None and _parses(match.group(1))
+    return _jinja_verdicts.set(key, verdict)
+
+_RAW_RE = re.compile(r"jinja\n?")
 
 def _extract_raw_jinja(jinja_string):
-    return re.sub(r"jinja\n?", "", jinja_string)
+    if isinstance(jinja_string, _JinjaStr):
+        return jinja_string.body
+    return _RAW_RE.sub("", jinja_string)
 
 def _jinja(string):
-    if _is_jinja(string):
+    if isinstance(string, _JinjaStr) or _is_jinja(string):
         return string
-    else:
-        return f"""jinja 
-{string}"""
+    return _JinjaStr(f"{_FRAGMENT_HEADER}{string}", string)
+
+_HEADER_RE = re.compile(r"^jinja\s*\n?")
+_FRAGMENT_HEADER = "jinja \n"
+
+class _JinjaStr(str):
+    def __new__(cls, value, body=None):
+        self = super().__new__(cls, value)
+        self._body = body
+        return self
+
+    def __reduce__(self):
+        return (_JinjaStr, (str(self),))
+
+    @property
+    def body(self):
+        if self._body is None:
+            m = _HEADER_RE.match(self)
+            self._body = self[m.end():] if m else str(self)
+        return self._body
+
+    @property
+    def template(self):
+        env = _jinja_env()
+        cached = self.__dict__.get("_template")
+        if cached is None or cached[0] is not env:
+            cached = self._template = (env, _jinja_template(self.body, env))
+        return cached[1]
+
+    @property
+    def variables(self):
+        env = _jinja_env()
+        cached = self.__dict__.get("_variables")
+        if cached is None or cached[0] is not env:
+            ast = env.parse(self.body)
+            cached = self._variables = (env, frozenset(meta.find_undeclared_variables(ast)))
+        return cached[1]
+
+_fragment_slots = ContextVar("comp_fragment_slots", default=None)
+_SLOT_PREFIX = "__fragment_"
+_SLOT_RE = re.compile(r"__fragment_(\d+)_(\d+)__")
+
+class _Slots:
+    __slots__ = ("parent", "depth", "html")
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.html = []
+
+    def add(self, html):
+        self.html.append(html)
+        return f"{_SLOT_PREFIX}{self.depth}_{len(self.html) - 1}__"
+
+    def find(self, depth, index):
+        scope = self
+        while scope is not None and scope.depth > depth:
+            scope = scope.parent
+        if scope is None or index >= len(scope.html):
+            return None
+        return scope.html[index]
+
+    def lookup(self, name):
+        m = _SLOT_RE.fullmatch(name)
+        return self.find(int(m.group(1)), int(m.group(2))) if m else None
+
+def _resolve_fragments(string):
+    slots = _fragment_slots.get()
+    if slots is None or _SLOT_PREFIX not in string:
+        return string
+    def html(m):
+        found = slots.find(int(m.group(1)), int(m.group(2)))
+        return m.group(0) if found is None else found
+    return _SLOT_RE.sub(html, string)
+
+class _Fragment(_JinjaStr):
+    def __new__(cls, html):
+        return super().__new__(cls, f"{_FRAGMENT_HEADER}{html}", html)
+
+    def __reduce__(self):
+        return (_Fragment, (self._body,))
+
+    @property
+    def html(self):
+        return self._body
+
+    def __format__(self, spec):
+        slots = _fragment_slots.get()
+        if slots is None:
+            return format(str(self), spec)
+        if spec:
+            return format(self._body, spec)
+        env = _jinja_env()
+        return f"{env.variable_start_string} {slots.add(self._body)} {env.variable_end_string}"
+
+def _without_headers(string):
+    if isinstance(string, _Fragment):
+        return string
+    if isinstance(string, _JinjaStr):
+        string = string.body
+    if _FRAGMENT_HEADER in string:
+        return string.replace(_FRAGMENT_HEADER, "")
+    return string
+
+def _finalize(value):
+    if isinstance(value, _Fragment):
+        return value._body
+    if isinstance(value, str):
+        return _without_headers(value)
+    return value
+
+def _strip_header(jinja_string):
+    if isinstance(jinja_string, _JinjaStr):
+        return jinja_string.body
+    return _without_headers(_HEADER_RE.sub("", jinja_string, count=1))
+
+def _fragment_html(value):
+    if isinstance(value, _JinjaStr):
+        return value.body
+    return _strip_header(str(value))
+
+def _call_definer(func, args, kwargs):
+    slots = _Slots(_fragment_slots.get())
+    token = _fragment_slots.set(slots)
+    try:
+        return func(*args, **kwargs), slots
+    finally:
+        _fragment_slots.reset(token)
+
+def _render_definer(template, context):
+    token = _fragment_slots.set(None)
+    try:
+        return _Fragment(template.render(**context))
+    finally:
+        _fragment_slots.reset(token)
+
+async def _acall_definer(func, args, kwargs):
+    slots = _Slots(_fragment_slots.get())
+    token = _fragment_slots.set(slots)
+    try:
+        return await func(*args, **kwargs), slots
+    finally:
+        _fragment_slots.reset(token)
+
+async def _arender_definer(template, context):
+    token = _fragment_slots.set(None)
+    try:
+        return _Fragment(await template.render_async(**context))
+    finally:
+        _fragment_slots.reset(token)
 
 def _get_jinja(comp):
     if hasattr(comp, "jinja"):
@@ -104,8 +446,9 @@ def _get_jinja(comp):
     return ""
 
 def _find_jinja_vars(source):
-    regex_str = re.compile(_jinja_regex(), re.DOTALL)
-    match = regex_str.match(source)
+    if isinstance(source, _JinjaStr):
+        return set(source.variables)
+    match = _JINJA_RE.match(source)
     if not match:
         return set()
     jinja_src = match.group(1)
@@ -131,7 +474,8 @@ def _find_jinja_inner_vars(jinja_src, block_start="[%", block_end="%]"):
     return inner_vars
 
 def _render_jinja(jinja_string, **context):
+    if isinstance(jinja_string, _JinjaStr):
+        return jinja_string.template.render(**context)
     jinja_src = _extract_raw_jinja(jinja_string)
-    env = _jinja_env()
-    template = env.from_string(jinja_src)
+    template = _jinja_template(jinja_src)
     return template.render(**context)
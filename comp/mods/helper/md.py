@@ -0,0 +1,45 @@
+import os
+import hashlib
+import threading
+from markdown import Markdown
+from comp.mods.helper.cache import _SizedLRU, _cache_size
+
+_md_cache = _SizedLRU("markdown", _cache_size("COMP_MARKDOWN_CACHE_BYTES", 16 * 1024 * 1024))
+_POOL_SIZE = _cache_size("COMP_MARKDOWN_POOL_SIZE", 8)
+
+_pool = []
+_pool_lock = threading.Lock()
+
+def _acquire():
+    with _pool_lock:
+        if _pool:
+            return _pool.pop()
+    return Markdown()
+
+def _release(converter):
+    with _pool_lock:
+        if len(_pool) < _POOL_SIZE:
+            _pool.append(converter)
+
+def _convert(text):
+    converter = _acquire()
+    try:
+        return converter.reset().convert(text)
+    finally:
+        _release(converter)
+
+def _markdown(text):
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    html = _md_cache.get(key)
+    if html is None:
+        html = _md_cache.set(key, _convert(text))
+    return html
+
+def _markdown_file(path, read):
+    full = os.path.abspath(path)
+    st = os.stat(full)
+    key = (full, st.st_mtime_ns, st.st_size)
+    html = _md_cache.get(key)
+    if html is None:
+        html = _md_cache.set(key, _convert(read(path)))
+    return html
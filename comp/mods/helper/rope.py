@@ -0,0 +1,31 @@
+class _Rope:
+    __slots__ = ("text", "inserts")
+
+    def __init__(self, text):
+        self.text = text
+        self.inserts = []
+
+    def search(self, pattern):
+        return pattern.search(self.text)
+
+    def insert(self, offset, text):
+        if text:
+            self.inserts.append((offset, len(self.inserts), text))
+
+    def prepend(self, text):
+        self.insert(0, text)
+
+    def append(self, text):
+        self.insert(len(self.text), text)
+
+    def join(self):
+        if not self.inserts:
+            return self.text
+        pieces = []
+        start = 0
+        for offset, _, text in sorted(self.inserts):
+            pieces.append(self.text[start:offset])
+            pieces.append(text)
+            start = offset
+        pieces.append(self.text[start:])
+        return "".join(pieces)
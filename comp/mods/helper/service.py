@@ -851,6 +851,62 @@ def _minify(html):
     html = html.strip()
     return html
 
+class _StreamMinifier:
+    _BLOCKS = (
+        (re.compile(r'<script\b', re.IGNORECASE), re.compile(r'</script>', re.IGNORECASE)),
+        (re.compile(r'<style\b', re.IGNORECASE), re.compile(r'</style>', re.IGNORECASE)),
+        (re.compile(r'<!--'), re.compile(r'-->')),
+    )
+    _NEXT = re.compile(r'\s*(\S{0,4})')
+
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+
+    def _boundary(self, html, end):
+        pos = html.rfind(">", 0, end)
+        while pos >= 0:
+            head = self._NEXT.match(html, pos + 1).group(1)
+            closes_comment = pos >= 2 and html.startswith("--", pos - 2)
+            if head and not closes_comment and not "<!--".startswith(head):
+                return pos + 1
+            pos = html.rfind(">", 0, pos)
+        return 0
+
+    def _safe_cut(self, html):
+        cut = self._boundary(html, len(html))
+        changed = True
+        while cut > 0 and changed:
+            changed = False
+            for opening, closing in self._BLOCKS:
+                last_open = None
+                for last_open in opening.finditer(html, 0, cut):
+                    pass
+                if last_open is None:
+                    continue
+                if not closing.search(html, last_open.end(), cut):
+                    cut = self._boundary(html, last_open.start())
+                    changed = True
+        return cut
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        cut = self._safe_cut(self._buffer)
+        if cut <= 0:
+            return ""
+        html, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._minify(html)
+
+    def flush(self):
+        html, self._buffer = self._buffer, ""
+        return self._minify(html) if html else ""
+
+    def _minify(self, html):
+        if not self._started:
+            html = _minify(html)
+            self._started = bool(html)
+            return html
+        return _minify(">" + html)[1:]
 
 class _PREVIEW:
     _instance = None
@@ -2,6 +2,10 @@ import re
 from functools import update_wrapper
 from typed import typed, Union, TYPE, Lazy, Str, Dict, Bool, Typed, name
 from comp.mods.types.meta import _COMP_, _LAZY_COMP_
+from comp.mods.helper.fold import _fold_cache, _fold_key
+from comp.mods.helper.trust import _is_trusted
+from comp.mods.helper.fragments import _cache_policy, _cached_call
+from comp.mods.helper.helper import _Fragment
 
 def _has_vars_of_given_type(instance, BASE, typ, n):
     if n < 0:
@@ -33,9 +37,28 @@ class LazyCompNull:
 
 class COMP(Typed, metaclass=_COMP_):
     __display__ = "COMP"
+    _comp_kind = "comp"
     from comp.mods.helper.null import nill_comp
     __null__ = CompNull()
 
+    def __call__(self, *args, **kwargs):
+        call = self.func if _is_trusted() else super().__call__
+        spec = kwargs.pop("__cache__", None)
+        policy = self.__dict__.get("_cache_policy") if spec is None else _cache_policy(spec)
+        if policy is not None:
+            return _cached_call(self, call, policy, args, kwargs)
+        if not self.__dict__.get("_fold"):
+            return call(*args, **kwargs)
+        key = _fold_key(self._definer, args, kwargs)
+        if key is None:
+            return call(*args, **kwargs)
+        result = _fold_cache.get(key)
+        if result is None:
+            result = call(*args, **kwargs)
+            if isinstance(result, _Fragment):
+                _fold_cache.set(key, result)
+        return result
+
     @property
     def jinja(self):
         if hasattr(self, '_jinja'):
@@ -46,6 +69,13 @@ class COMP(Typed, metaclass=_COMP_):
             func = func.__wrapped__
         return inspect.getsource(func)
 
+    @property
+    def dependencies(self):
+        return {
+            source: tuple(sorted(n for n in names if not n.startswith("__fragment_")))
+            for source, names in self.__dict__.get("_dependencies", {}).items()
+        }
+
     def render(self, **context):
         from comp.mods.service import render
         return render(self, **context)
@@ -145,8 +175,25 @@ class COMP(Typed, metaclass=_COMP_):
             return func.__annotations__
         return {}
 
+class ASYNC_COMP(COMP):
+    __display__ = "ASYNC_COMP"
+    is_async = True
+
+    def __call__(self, *args, **kwargs):
+        if kwargs.pop("__cache__", None) not in (None, False):
+            raise TypeError(
+                "Fragment caching is not supported for async comps:\n"
+                f" ==> '{getattr(self, '__name__', self)}': received '__cache__'"
+            )
+        return self.func(*args, **kwargs)
+
+    async def render(self, **context):
+        from comp.mods.service import render_async
+        return await render_async(self, **context)
+
 class LAZY_COMP(Lazy, metaclass=_LAZY_COMP_):
     __display__ = 'LAZY_COMP'
+    _comp_kind = "lazy"
     from comp.mods.helper.null import nill_lazy_comp
     __null__ =  LazyCompNull()
 
@@ -172,8 +219,9 @@ class LAZY_COMP(Lazy, metaclass=_LAZY_COMP_):
         from comp.mods.service import preview
         return preview.add(self, **context)
 
-    def __init__(self, f):
+    def __init__(self, f, **options):
         self._orig = f
+        self._options = options
         self._wrapped = None
         self.func = f
         self.lazy = True
@@ -187,7 +235,7 @@ class LAZY_COMP(Lazy, metaclass=_LAZY_COMP_):
     def _materialize(self):
         if getattr(self, "_wrapped", None) is None:
             from comp.mods.decorators import comp as _comp
-            self._wrapped = _comp(self._orig, lazy=False)
+            self._wrapped = _comp(self._orig, lazy=False, **self.__dict__.get("_options", {}))
         return self._wrapped
 
     def __call__(self, *a, **kw):
@@ -290,50 +338,60 @@ class LAZY_COMP(Lazy, metaclass=_LAZY_COMP_):
             return func.__annotations__
         return {}
 
-@typed
-def _check_page(page: COMP) -> Bool:
-    from comp.mods.service import render
-    errors = []
-    html = render(page)
-    html_match = re.search(r"<html[^>]*>(.*?)</html>", html, flags=re.IGNORECASE | re.DOTALL)
-    head_match = re.search(r"<head[^>]*>(.*?)</head>", html, flags=re.IGNORECASE | re.DOTALL)
-    body_match = re.search(r"<body[^>]*>(.*?)</body>", html, flags=re.IGNORECASE | re.DOTALL)
-    if not (html_match and head_match and body_match):
+_HTML_RE = re.compile(r"<html[^>]*>(.*?)</html>", re.IGNORECASE | re.DOTALL)
+_HEAD_RE = re.compile(r"<head[^>]*>(.*?)</head>", re.IGNORECASE | re.DOTALL)
+_BODY_RE = re.compile(r"<body[^>]*>(.*?)</body>", re.IGNORECASE | re.DOTALL)
+_BODY_OUTER_RE = re.compile(r"<body[^>]*>(.*?</body>)", re.IGNORECASE | re.DOTALL)
+_HTML_OPEN_RE = re.compile(r"<html[^>]*>", re.IGNORECASE)
+_OPEN_TAG_RE = re.compile(r"<[^/!][^>]*>")
+
+def _page_shape(html):
+    html_match = _HTML_RE.search(html)
+    if not html_match or not html_match.group(1):
         return False
-    html_content = html_match.group(1)
-    if not html_content:
+    head_match = _HEAD_RE.search(html)
+    body_outer_match = _BODY_OUTER_RE.search(html)
+    if not (head_match and body_outer_match):
         return False
-    html_outer_match = re.search(r"<html[^>]*>(.*?)</html>", html, flags=re.IGNORECASE | re.DOTALL)
-    head_outer_match = re.search(r"<head[^>]*>(.*?)</head>", html, flags=re.IGNORECASE | re.DOTALL)
-    body_outer_match = re.search(r"<body[^>]*>(.*?</body>)", html, flags=re.IGNORECASE | re.DOTALL)
 
-    if not (html_outer_match and head_outer_match and body_outer_match):
-        return False
-    else:
-        html_start, html_end = html_outer_match.span()
-        head_start, head_end = head_outer_match.span()
-        body_start, body_end = body_outer_match.span()
+    html_start, html_end = html_match.span()
+    head_start, head_end = head_match.span()
+    body_start, body_end = body_outer_match.span()
 
-        if not (html_start < head_start < html_end and head_end < html_end):
-            return False
-        if not (html_start < body_start < html_end and body_end < html_end):
-            return False
-        html_opening_tag = re.match(r"<html[^>]*>", html, re.IGNORECASE)
-        if html_opening_tag:
-            text_before_head = html[html_opening_tag.end():head_start]
-            if re.search(r"<[^/!][^>]*>", text_before_head):
-                return False
-            text_between_head_body = html[head_end:body_start]
-            if re.search(r"<[^/!][^>]*>", text_between_head_body):
-                return False
-        if body_start < head_start < body_end:
+    if not (html_start < head_start < html_end and head_end < html_end):
+        return False
+    if not (html_start < body_start < html_end and body_end < html_end):
+        return False
+    html_opening_tag = _HTML_OPEN_RE.match(html)
+    if html_opening_tag:
+        if _OPEN_TAG_RE.search(html, html_opening_tag.end(), head_start):
             return False
-        if head_start < body_start < head_end:
+        if _OPEN_TAG_RE.search(html, head_end, body_start):
             return False
+    if body_start < head_start < body_end:
+        return False
+    if head_start < body_start < head_end:
+        return False
     return True
 
+def _page_verdict(page, html=None):
+    verdict = page.__dict__.get("_page_verdict")
+    if verdict is None:
+        if html is None:
+            from comp.mods.service import render
+            html = render(page, __styled__=False)
+        verdict = page.__dict__["_page_verdict"] = _page_shape(html)
+    return verdict
+
+@typed
+def _check_page(page: COMP) -> Bool:
+    return _page_verdict(page)
+
 class _PAGE(TYPE(COMP), TYPE(LAZY_COMP)):
     def __instancecheck__(cls, instance):
         if not instance in Union(COMP, LAZY_COMP):
             return False
+        verdict = instance.__dict__.get("_page_verdict")
+        if verdict is not None:
+            return verdict
         return _check_page(instance)
@@ -5,7 +5,7 @@ from comp.mods.types.base import Jinja, Inner
 from comp.mods.helper.types_ import COMP, LAZY_COMP
 from comp.mods.err import ConcatErr, JoinErr, EvalErr
 from comp.mods.helper.operations import _merge_context, _get_context, _copy, _order_params
-from comp.mods.helper.helper import _get_jinja, _jinja
+from comp.mods.helper.helper import _get_jinja, _jinja, _strip_header, _Fragment, _fragment_html
 
 @typed
 def copy(comp: Union(COMP, LAZY_COMP), **renamed_args: Dict(Str)) -> Union(COMP, LAZY_COMP):
@@ -69,7 +69,7 @@ def concat(comp_1: Union(COMP, LAZY_COMP), comp_2: Union(COMP, LAZY_COMP)) -> Un
         jinja1 = _get_jinja(comp_1)
         jinja2 = _get_jinja(comp_2)
         concat_jinja = jinja1
-        concat_jinja = re.sub(r"^jinja\s*\n?", "", concat_jinja)
+        concat_jinja = _strip_header(concat_jinja)
         concat_jinja = re.sub(r'{\s*' + re.escape(inner_param_name) + r'\s*}', jinja2, concat_jinja)
         concat_jinja = re.sub(r'\[\[\s*' + re.escape(inner_param_name) + r'\s*\]\]', jinja2, concat_jinja)
         comp._jinja = concat_jinja
@@ -148,17 +148,14 @@ def join(*comps: Tuple(COMP, LAZY_COMP)) -> Union(COMP, LAZY_COMP):
                 if '__context__' in sig.parameters:
                     local_args['__context__'] = context
                 results.append(comp(**local_args))
-            return _jinja(''.join(str(r) for r in results))
+            return _Fragment(''.join([_fragment_html(r) for r in results]))
 
         wrapper.__signature__ = new_sig
         wrapper.__annotations__ = dict(new_annotations)
         from comp.mods.decorators import comp as _comp
         comp = _comp(wrapper)
 
-        joined_jinja_list = [_get_jinja(c) for c in comps]
-        for i in range(len(joined_jinja_list)):
-            joined_jinja_list[i] = re.sub(r"^jinja\s*\n?", "", joined_jinja_list[i])
-        joined_jinja = "".join(joined_jinja_list)
+        joined_jinja = "".join(_strip_header(_get_jinja(c)) for c in comps)
         comp._jinja = joined_jinja
 
         return comp
@@ -201,10 +198,11 @@ def eval(func: Union(COMP, LAZY_COMP), **fixed_kwargs: Dict) -> Union(COMP, LAZY
             call_kwargs['__context__'] = context
 
             template_str = func(**call_kwargs)
+            if isinstance(template_str, _Fragment):
+                return template_str
             if isinstance(template_str, str):
-                from comp.mods.helper.helper import _jinja_env
-                env = _jinja_env()
-                template = env.from_string(template_str)
+                from comp.mods.helper.helper import _jinja_template
+                template = _jinja_template(template_str)
                 return template.render(**call_kwargs)
             else:
                 return _jinja(template_str)
@@ -217,7 +215,7 @@ def eval(func: Union(COMP, LAZY_COMP), **fixed_kwargs: Dict) -> Union(COMP, LAZY
         comp = _comp(wrapper)
 
         base_jinja = _get_jinja(func)
-        base_jinja = re.sub(r'^jinja\s*\n?', '', base_jinja)
+        base_jinja = _strip_header(base_jinja)
         jinja_eval = base_jinja
         for k, v in fixed_kwargs.items():
             jinja_eval = re.sub(r'\[\[\s*' + re.escape(k) + r'\s*\]\]', str(v), jinja_eval)
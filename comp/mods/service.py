@@ -1,21 +1,34 @@
 import re
-from inspect import signature
+from functools import lru_cache
+from inspect import signature, isawaitable, iscoroutinefunction
 from typed import typed, Bool, List, Str, Dict, Any, Union
 from utils import file
 from utils.types import Extension, Url, File
-from markdown import markdown
 from comp.mods.types.base import Content
 from comp.mods.helper.helper import (
     _jinja,
     _extract_raw_jinja,
     _render_jinja,
     _find_jinja_inner_vars,
-    _find_jinja_vars
+    _find_jinja_vars,
+    _jinja_template,
+    _jinja_async_env,
+    _strip_header,
+    _fragment_html,
+    _call_definer,
+    _template_free_vars,
+    _pruned_context,
+    _Fragment
 )
-from comp.mods.helper.service import _style, _minify, _Preview
+from comp.mods.helper.rope import _Rope
+from comp.mods.helper.files import _inline_tag
+from comp.mods.helper.md import _markdown, _markdown_file
+from comp.mods.helper.service import _style, _minify, _StreamMinifier, _Preview
+from comp.mods.helper.trust import _is_trusted
+from comp.mods.compiler import _check_domain
 from comp.mods.err import RenderErr, MockErr
 from comp.mods.types.base import Jinja, PAGE
-from comp.mods.helper.types_ import COMP, LAZY_COMP
+from comp.mods.helper.types_ import COMP, LAZY_COMP, _page_verdict
 from comp.comps.includes import script as script_entity, asset as asset_entity
 from comp.models import Script, Asset
 
@@ -37,6 +50,120 @@ def jinja_inner_vars(entity: Union(Jinja, COMP, LAZY_COMP)) -> Dict(Any):
 def jinja_free_vars(entity: Union(Jinja, COMP, LAZY_COMP)) -> Dict(Any):
     return jinja_vars(entity)["free"]
 
+_SPECIAL_ARGS = frozenset({"__scripts__", "__assets__", "__styled__"})
+
+class _RenderPlan:
+    __slots__ = ("definer", "name", "names", "valid", "defaults", "content", "domain")
+
+    def __init__(self, definer):
+        params = signature(definer).parameters
+        self.definer = definer
+        self.name = getattr(definer, '__name__', definer)
+        self.names = ', '.join(sorted(params))
+        self.valid = frozenset(params) | _SPECIAL_ARGS
+        self.defaults = {
+            name: ("" if param.default is param.empty else param.default)
+            for name, param in params.items()
+        }
+        self.content = tuple(
+            name for name, param in params.items()
+            if getattr(param, "annotation", None) is Content
+        )
+        self.domain = tuple(
+            (name, param.annotation) for name, param in params.items()
+            if param.annotation is not param.empty
+        )
+
+def _render_plan(entity):
+    definer = getattr(entity, "func", entity)
+    state = getattr(entity, "__dict__", None)
+    plan = state.get("_render_plan") if state is not None else None
+    if plan is None or plan.definer is not definer:
+        plan = _RenderPlan(definer)
+        if state is not None:
+            state["_render_plan"] = plan
+    return plan
+
+def _render_call_args(entity, kwargs):
+    plan = _render_plan(entity)
+
+    unknown_args = kwargs.keys() - plan.valid
+    if unknown_args:
+        raise TypeError(
+            f"[render] Unexpected keyword argument(s) for '{plan.name}': {', '.join(sorted(unknown_args))}\n"
+            f"Allowed arguments: {plan.names}"
+        )
+
+    for special in _SPECIAL_ARGS:
+        kwargs.pop(special, None)
+
+    for cname in plan.content:
+        if cname in kwargs:
+            value = kwargs[cname]
+            if value.lower() in Extension('md') and value in File:
+                kwargs[cname] = _markdown_file(value, file.read)
+            else:
+                kwargs[cname] = _markdown(value)
+
+    call_args = dict(plan.defaults)
+    call_args.update(kwargs)
+    return call_args
+
+@lru_cache(maxsize=1024)
+def _is_local_file(path, extension):
+    return path in Extension(extension) and not path in Url('http', 'https')
+
+def _include_tags(__scripts__, __assets__):
+    script_tags = []
+    for scr in __scripts__:
+        script_src = scr.script_src
+        if _is_local_file(script_src, 'js'):
+            script_tags.append(_inline_tag(script_src, "script"))
+        else:
+            tag = render(script_entity, script=scr, __styled__=False)
+            script_tags.append(tag)
+    scripts_insert = "\n".join(script_tags)
+
+    asset_tags = []
+    for ast in __assets__:
+        href = getattr(ast, "asset_href", "")
+        if href and _is_local_file(href, 'css'):
+            asset_tags.append(_inline_tag(href, "style"))
+        elif href and href in Url('http', 'https'):
+            tag = render(asset_entity, asset=ast, __styled__=False)
+            asset_tags.append(tag)
+        else:
+            tag = render(asset_entity, asset=ast, __styled__=False)
+            asset_tags.append(tag)
+    assets_insert = "\n".join(asset_tags)
+    return scripts_insert, assets_insert
+
+_HEAD_OPEN = re.compile(r'<head\b[^>]*>', re.IGNORECASE)
+_BODY_CLOSE = re.compile(r'</body>', re.IGNORECASE)
+
+def _render_includes(rope, __scripts__, __assets__):
+    scripts_insert, assets_insert = _include_tags(__scripts__, __assets__)
+    if assets_insert:
+        m = rope.search(_HEAD_OPEN)
+        if m:
+            rope.insert(m.end(), assets_insert)
+        else:
+            rope.prepend(assets_insert)
+    if scripts_insert:
+        m = rope.search(_BODY_CLOSE)
+        if m:
+            rope.insert(m.start(), scripts_insert)
+        else:
+            rope.append(scripts_insert)
+    return rope
+
+def _render_finish(html, __styled__, __minified__):
+    if __styled__:
+        html = _style(html)
+    if __minified__:
+        html = _minify(html)
+    return html
+
 def render(
         entity: Union(Jinja, COMP, LAZY_COMP),
         __scripts__:    List(Script)=[],
@@ -47,131 +174,191 @@ def render(
     ) -> Str:
 
     try:
+        if isinstance(entity, _Fragment):
+            return entity.html
         if entity in Jinja:
             return _render_jinja(entity, **kwargs)
 
-        definer = getattr(entity, "func", entity)
-        sig = signature(definer)
-        valid_params = set(sig.parameters.keys())
-        special = {"__scripts__", "__assets__", "__styled__"}
-        valid_params = valid_params | special
-
-        unknown_args = set(kwargs) - valid_params
-        if unknown_args:
+        cache = kwargs.pop("__cache__", None)
+        call_args = _render_call_args(entity, kwargs)
+        result = entity(**call_args) if cache is None else entity(**call_args, __cache__=cache)
+        if isawaitable(result):
+            result.close()
             raise TypeError(
-                f"[render] Unexpected keyword argument(s) for '{getattr(definer, '__name__', definer)}': {', '.join(sorted(unknown_args))}\n"
-                f"Allowed arguments: {', '.join(sorted(set(sig.parameters)))}"
+                f"[render] '{getattr(entity, '__name__', entity)}' is an async comp: use 'render_async' instead"
             )
+        rendered = isinstance(result, _Fragment)
+        rope = _Rope(result.html if rendered else _extract_raw_jinja(result))
+        rope = _render_includes(rope, __scripts__, __assets__)
 
-        kwargs.pop("__scripts__", None)
-        kwargs.pop("__assets__", None)
-        kwargs.pop("__styled__", None)
+        if rendered:
+            html = rope.join()
+        else:
+            jinja = rope.join()
+            context = dict(call_args)
+            context.update(kwargs)
+            context = _pruned_context(_template_free_vars(jinja), context)
+            html = _jinja_template(jinja).render(**context)
+        return _render_finish(html, __styled__, __minified__)
+    except Exception as e:
+        raise RenderErr(e)
 
-        content_params = {
-            name: param
-            for name, param in sig.parameters.items()
-            if getattr(param, "annotation", None) is Content
-        }
-        for cname, param in content_params.items():
-            if cname in kwargs:
-                value = kwargs[cname]
-                if value in Str:
-                    kwargs[cname] = markdown(value)
-                if value.lower() in Extension('md') and value in File:
-                    md_text = file.read(value)
-                    kwargs[cname] = markdown(md_text)
-                else:
-                    kwargs[cname] = markdown(value)
-
-        call_args = {}
-        for param in sig.parameters.values():
-            if param.name in kwargs:
-                call_args[param.name] = kwargs[param.name]
-            elif param.default is not param.empty:
-                call_args[param.name] = param.default
-            else:
-                call_args[param.name] = ""
-
-        jinja = _extract_raw_jinja(entity(**call_args))
-
-        script_tags = []
-        for scr in __scripts__:
-            script_src = scr.script_src
-            if script_src in Extension('js') and not script_src in Url('http', 'https'):
-                try:
-                    with open(script_src, "r", encoding="utf-8") as f:
-                        code = f.read()
-                    tag = f"<script>{code}</script>"
-                except Exception as e:
-                    tag = f"<!-- [Could not read {script_src}: {e}] -->"
-                script_tags.append(tag)
-            else:
-                tag = render(script_entity, script=scr, __styled__=False)
-                script_tags.append(tag)
-        scripts_insert = "\n".join(script_tags)
-
-        asset_tags = []
-        for ast in __assets__:
-            href = getattr(ast, "asset_href", "")
-            if href and href in Extension('css') and not href in Url('http', 'https'):
-                try:
-                    with open(href, "r", encoding="utf-8") as f:
-                        code = f.read()
-                    tag = f"<style>{code}</style>"
-                except Exception as e:
-                    tag = f"<!-- [Could not read {href}: {e}] -->"
-                asset_tags.append(tag)
-            elif href and href in Url('http', 'https'):
-                tag = render(asset_entity, asset=ast, __styled__=False)
-                asset_tags.append(tag)
-            else:
-                tag = render(asset_entity, asset=ast, __styled__=False)
-                asset_tags.append(tag)
-        assets_insert = "\n".join(asset_tags)
+async def render_async(
+        entity: Union(Jinja, COMP, LAZY_COMP),
+        __scripts__:    List(Script)=[],
+        __assets__:     List(Asset)=[],
+        __styled__:     Bool=True,
+        __minified__:   Bool=False,
+        **kwargs:       Dict(Any)
+    ) -> Str:
 
-        head_pattern = re.compile(r'(<head\b[^>]*>)(.*?)(</head>)', re.IGNORECASE | re.DOTALL)
-        def _insert_into_head(html_content, insert_str):
-            m = head_pattern.search(html_content)
-            if m:
-                return html_content[:m.end(1)] + insert_str + m.group(2) + html_content[m.start(3):]
-            return None
+    try:
+        if isinstance(entity, _Fragment):
+            return entity.html
+        if entity in Jinja:
+            template = _jinja_template(_extract_raw_jinja(entity), _jinja_async_env())
+            return await template.render_async(**kwargs)
 
-        if assets_insert:
-            new_jinja = _insert_into_head(jinja, assets_insert)
-            if new_jinja is not None:
-                jinja = new_jinja
-            else:
-                jinja = assets_insert + jinja
+        cache = kwargs.pop("__cache__", None)
+        call_args = _render_call_args(entity, kwargs)
+        result = entity(**call_args) if cache is None else entity(**call_args, __cache__=cache)
+        if isawaitable(result):
+            result = await result
+        rendered = isinstance(result, _Fragment)
+        rope = _Rope(result.html if rendered else _extract_raw_jinja(result))
+        jinja = _render_includes(rope, __scripts__, __assets__).join()
 
-        body_pattern = re.compile(r'(<body\b[^>]*>)(.*?)(</body>)', re.IGNORECASE | re.DOTALL)
-        def _insert_into_body(html_content, insert_str):
-            m = body_pattern.search(html_content)
-            if m:
-                return html_content[:m.start(3)] + insert_str + html_content[m.start(3):]
-            return None
+        if rendered:
+            html = jinja
+        else:
+            context = dict(call_args)
+            context.update(kwargs)
+            context = _pruned_context(_template_free_vars(jinja), context)
+            template = _jinja_template(jinja, _jinja_async_env())
+            html = await template.render_async(**context)
+        return _render_finish(html, __styled__, __minified__)
+    except Exception as e:
+        raise RenderErr(e)
 
+def _stream_includes(chunks, scripts_insert, assets_insert):
+    buffer = ""
+    scan = 0
+    keep = len("</body>") - 1
+    for chunk in chunks:
+        buffer += chunk
+        if assets_insert:
+            m = _HEAD_OPEN.search(buffer, scan)
+            if not m:
+                scan = buffer.rfind(">") + 1
+                continue
+            yield buffer[:m.end()]
+            yield assets_insert
+            buffer = buffer[m.end():]
+            assets_insert = ""
         if scripts_insert:
-            new_jinja = _insert_into_body(jinja, scripts_insert)
-            if new_jinja is not None:
-                jinja = new_jinja
-            else:
-                jinja = jinja + scripts_insert
+            m = _BODY_CLOSE.search(buffer)
+            if not m:
+                if len(buffer) > keep:
+                    yield buffer[:-keep]
+                    buffer = buffer[-keep:]
+                continue
+            yield buffer[:m.start()]
+            yield scripts_insert
+            buffer = buffer[m.start():]
+            scripts_insert = ""
+        if buffer:
+            yield buffer
+            buffer = ""
+    if scripts_insert:
+        m = _BODY_CLOSE.search(buffer)
+        if m:
+            buffer = buffer[:m.start()] + scripts_insert + buffer[m.start():]
+        else:
+            buffer += scripts_insert
+    yield assets_insert + buffer
 
-        context = {}
-        context.update(call_args)
-        context.update(kwargs)
+def _comp_chunks(entity, call_args, cache=None):
+    if getattr(entity, "is_lazy", False):
+        entity = entity._materialize()
+    definer = getattr(entity, "_definer", None)
+    checked = not _is_trusted()
+    cached = cache is not None or entity.__dict__.get("_cache_policy") is not None
+    if definer is None or cached or iscoroutinefunction(definer) or (checked and entity.codomain is not Jinja):
+        result = entity(**call_args) if cache is None else entity(**call_args, __cache__=cache)
+        if isawaitable(result):
+            result.close()
+            raise TypeError(
+                f"[render] '{getattr(entity, '__name__', entity)}' is an async comp: use 'render_async' instead"
+            )
+        yield _fragment_html(result)
+        return
+    if checked:
+        _check_domain(definer, _render_plan(entity).domain, call_args)
+    jinja_str, slots = _call_definer(definer, (), call_args)
+    if isinstance(jinja_str, _Fragment):
+        yield jinja_str.html
+        return
+    source = _strip_header(jinja_str)
+    context = _pruned_context(_template_free_vars(source), call_args, slots)
+    template = _jinja_template(source, compact=entity.__dict__.get("_compact", False))
+    yield from template.generate(**context)
 
-        html = _render_jinja(jinja, **context)
+def render_stream(
+        entity: Union(Jinja, COMP, LAZY_COMP),
+        __scripts__:    List(Script)=[],
+        __assets__:     List(Asset)=[],
+        __styled__:     Bool=True,
+        __minified__:   Bool=False,
+        **kwargs:       Dict(Any)
+    ):
+
+    try:
+        if isinstance(entity, _Fragment):
+            chunks = iter((entity.html,))
+        elif entity in Jinja:
+            chunks = _jinja_template(_extract_raw_jinja(entity)).generate(**kwargs)
+        else:
+            cache = kwargs.pop("__cache__", None)
+            call_args = _render_call_args(entity, kwargs)
+            chunks = _comp_chunks(entity, call_args, cache)
+            scripts_insert, assets_insert = _include_tags(__scripts__, __assets__)
+            if scripts_insert or assets_insert:
+                chunks = _stream_includes(chunks, scripts_insert, assets_insert)
 
         if __styled__:
-            html = _style(html)
+            yield _render_finish("".join(chunks), __styled__, __minified__)
+            return
         if __minified__:
-            html = _minify(html)
-
-        return html
+            minifier = _StreamMinifier()
+            for chunk in chunks:
+                out = minifier.feed(chunk)
+                if out:
+                    yield out
+            out = minifier.flush()
+            if out:
+                yield out
+            return
+        for chunk in chunks:
+            if chunk:
+                yield chunk
     except Exception as e:
         raise RenderErr(e)
 
+def render_to(
+        entity: Union(Jinja, COMP, LAZY_COMP),
+        fileobj: Any,
+        **kwargs: Dict(Any)
+    ):
+
+    written = 0
+    flush = getattr(fileobj, "flush", None)
+    for chunk in render_stream(entity, **kwargs):
+        fileobj.write(chunk)
+        written += len(chunk)
+        if flush is not None:
+            flush()
+    return written
+
 @typed
 def mock(entity: Union(COMP, LAZY_COMP), **kwargs: Dict(Any)) -> PAGE:
     try:
@@ -181,6 +368,8 @@ def mock(entity: Union(COMP, LAZY_COMP), **kwargs: Dict(Any)) -> PAGE:
         body_match = re.search(r"<body[^>]*>(.*?)</body>", html, flags=re.IGNORECASE | re.DOTALL)
 
         if html_match and head_match and body_match:
+            if not kwargs:
+                _page_verdict(entity, html)
             return entity
 
         from comp.mods.decorators import page
@@ -0,0 +1,14 @@
+from contextlib import contextmanager
+from comp.mods.helper import trust as _trust
+
+@contextmanager
+def trusted(enabled=True, sample=None):
+    if sample is None:
+        sample = _trust._SAMPLE
+    if not isinstance(sample, int) or isinstance(sample, bool) or sample < 0:
+        raise ValueError("sample must be a non-negative integer")
+    token = _trust._trusted_scope.set((bool(enabled), sample))
+    try:
+        yield
+    finally:
+        _trust._trusted_scope.reset(token)
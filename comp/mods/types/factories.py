@@ -1,37 +1,64 @@
 import re
+from comp.mods.helper.cache import _LRU, _cache_size, _memo
+from comp.mods.helper.helper import _JinjaStr
+
+_VOID_TAGS = frozenset({'input', 'img', 'br', 'hr', 'meta', 'link', 'source', 'track', 'wbr', 'area', 'base', 'col', 'embed', 'param'})
+_HEADER_RE = re.compile(r"jinja\s*\n?")
+
+_tag_types = _LRU("tag_types", _cache_size("COMP_TYPE_CACHE_SIZE", 1024))
+_tag_comp_types = _LRU("tag_comp_types", _cache_size("COMP_TYPE_CACHE_SIZE", 1024))
+
+def _tag_body_start(jinja):
+    if isinstance(jinja, _JinjaStr):
+        return jinja.body, 0
+    m = _HEADER_RE.match(jinja)
+    return jinja, m.end() if m else 0
 
 def Tag(*tags):
+    return _memo(_tag_types, tags, lambda: _build_tag(tags))
+
+def _build_tag(tags):
     from typed import TYPE, Str
     from comp.mods.types.base import Jinja
 
-    void_tags = {'input', 'img', 'br', 'hr', 'meta', 'link', 'source', 'track', 'wbr', 'area', 'base', 'col', 'embed', 'param'}
-
-    if len(tags) > 1:
-        tags_pattern = "|".join(tags)
-    else:
-        tags_pattern = tags[0]
-    if all(tag in void_tags for tag in tuple(tags)):
-        pattern_str = rf"^\n?\s*<({tags_pattern})\b[^>]*>(\s*)$"
-    else:
-        pattern_str = rf"^\n?\s*<{tags_pattern}\b[^>]*>(.*?)</{tags_pattern}>\s*$"
-
-    tag_regex = re.compile(pattern_str, re.DOTALL)
+    tags_pattern = "|".join(re.escape(tag) for tag in tags)
+    open_regex = re.compile(rf"\s*<({tags_pattern})\b[^>]*>")
+    close_regex = re.compile(rf"</({tags_pattern})>")
+    void = all(tag in _VOID_TAGS for tag in tags)
 
     class _Tag(TYPE(Jinja)):
         def __instancecheck__(cls, instance):
             if not isinstance(instance, Str):
                 return False
-            from comp.mods.helper.helper import _extract_raw_jinja
-            jinja = _extract_raw_jinja(instance)
-            return bool(tag_regex.match(jinja))
-    return _Tag(f'Tag({tags})', (Jinja,), {'__display__': f"Tag({','.join(tags)})"})
+            jinja, start = _tag_body_start(instance)
+            m = open_regex.match(jinja, start)
+            if not m:
+                return False
+            end = len(jinja)
+            while end > m.end() and jinja[end - 1].isspace():
+                end -= 1
+            if void:
+                return end == m.end()
+            close = jinja.rfind("</", m.end(), end)
+            return close >= 0 and close_regex.fullmatch(jinja, close, end) is not None
+
+    return _Tag(f'Tag({tags})', (Jinja,), {'__display__': f"Tag({','.join(tags)})", '_tags': tags})
 
 def TAG(tag):
+    return _memo(_tag_comp_types, tag, lambda: _build_tag_comp(tag))
+
+def _build_tag_comp(tag):
     from typed import TYPE
     from comp.mods.types import COMP
+    tag_type = Tag(tag)
+
     class _TAG(TYPE(COMP)):
         def __instancecheck__(cls, instance):
             if not isinstance(instance, COMP):
                 return False
-            return issubclass(instance.codomain, Tag(tag))
+            tags = getattr(instance.codomain, "_tags", None)
+            if tags:
+                return all(t == tag for t in tags)
+            return issubclass(instance.codomain, tag_type)
+
     return _TAG(f'TagComponent({tag})', (COMP,), {'__display__': f'TagComponent({tag})'})
@@ -1,25 +1,15 @@
-import re
 from typed import TYPE, Str, Typed, Lazy, names, name
 from typed.models import MODEL, LAZY_MODEL
+from comp.mods.helper.cache import _LRU, _cache_size, _memo
+
+_TYPE_CACHE_SIZE = _cache_size("COMP_TYPE_CACHE_SIZE", 1024)
 
 class JINJA(TYPE(Str)):
     def __instancecheck__(cls, instance):
         if not instance in Str:
             return False
-
-        from comp.mods.helper.helper import _jinja_regex
-        regex_str = re.compile(_jinja_regex(), re.DOTALL)
-        match = regex_str.match(instance)
-        if not match:
-            return False
-        jinja_content = match.group(1)
-        try:
-            from comp.mods.helper.helper import _jinja_env
-            _jinja_env().parse(jinja_content)
-            return True
-        except Exception as e:
-            print(f"{e}")
-            return False
+        from comp.mods.helper.helper import _is_valid_jinja
+        return _is_valid_jinja(instance)
 
 class INNER(TYPE(Str), TYPE(MODEL), TYPE(LAZY_MODEL)):
     def __instancecheck__(cls, instance):
@@ -28,7 +18,7 @@ class INNER(TYPE(Str), TYPE(MODEL), TYPE(LAZY_MODEL)):
         return True
 
 class _COMP_(TYPE(Typed)):
-    _param_cache = {}
+    _param_cache = _LRU("comp_types", _TYPE_CACHE_SIZE)
 
     def __call__(self, *args, **kwargs):
         if len(args) == 3 \
@@ -46,43 +36,46 @@ class _COMP_(TYPE(Typed)):
             inner   = kwargs.get('inner',   None)
             content = kwargs.get('content', None)
             key     = (types, cod, inner, content)
-            if key in self._param_cache:
-                return self._param_cache[key]
-            parts = []
-            if types:
-                parts.append(names(types))
-            if cod is not None:
-                parts.append(f"cod={name(cod)}")
-            class_name = f"{name(COMP)}({', '.join(parts)})" if parts else name(COMP)
-
-            attrs = {
-                "__display__":    class_name,
-                "_param_types":   types,
-                "_param_cod":     cod,
-                "_param_inner":   inner,
-                "_param_content": content,
-            }
-            ParamComp = self.__class__(class_name, (COMP,), attrs)
-            self._param_cache[key] = ParamComp
-            return ParamComp
 
-        return type.__call__(self, *args, **kwargs)
+            def build():
+                parts = []
+                if types:
+                    parts.append(names(types))
+                if cod is not None:
+                    parts.append(f"cod={name(cod)}")
+                class_name = f"{name(COMP)}({', '.join(parts)})" if parts else name(COMP)
 
-    def __instancecheck__(self, instance):
-        from comp.mods.helper.types_ import COMP
+                attrs = {
+                    "__display__":    class_name,
+                    "_param_types":   types,
+                    "_param_cod":     cod,
+                    "_param_inner":   inner,
+                    "_param_content": content,
+                }
+                return self.__class__(class_name, (COMP,), attrs)
+            return _memo(self._param_cache, key, build)
 
-        if getattr(instance, "is_lazy", False):
-            wrapped = getattr(instance, "_wrapped", None)
-            if wrapped is None:
-                return False
-            instance = wrapped
+        return type.__call__(self, *args, **kwargs)
 
-        if not TYPE(instance) <= COMP:
+    def __instancecheck__(self, instance):
+        kind = getattr(type(instance), "_comp_kind", None)
+        if kind is None:
             return False
+        if kind == "lazy":
+            instance = instance.__dict__.get("_wrapped")
+            if instance is None:
+                return False
 
-        if self is COMP:
+        if "_param_types" not in self.__dict__:
             return True
 
+        verdicts = instance.__dict__.setdefault("_type_verdicts", {})
+        verdict = verdicts.get(self)
+        if verdict is None:
+            verdict = verdicts[self] = self._param_check(instance)
+        return verdict
+
+    def _param_check(self, instance):
         types   = getattr(self, "_param_types", ())
         if types:
             domain = getattr(instance, "domain", None)
@@ -110,12 +103,12 @@ class _COMP_(TYPE(Typed)):
 
 class _LAZY_COMP_(TYPE(Lazy)):
     def __instancecheck__(cls, instance):
-        if not getattr(instance, "is_lazy", False):
+        if getattr(type(instance), "_comp_kind", None) != "lazy":
             return False
-        return getattr(instance, "_wrapped", None) is None
+        return instance.__dict__.get("_wrapped") is None
 
 class _RESPONSIVE(TYPE(Typed)):
-    _param_cache = {}
+    _param_cache = _LRU("responsive_types", _TYPE_CACHE_SIZE)
 
     def __call__(self, *args, **kwargs):
         if len(args) == 3 \
@@ -126,56 +119,55 @@ class _RESPONSIVE(TYPE(Typed)):
         from comp.mods.types.base import Responsive as BASE
 
         if self is BASE:
-            if args:
-                types = args
-                key   = ("pos", types)
-                if key in self._param_cache:
-                    return self._param_cache[key]
-                class_name = f"{name(BASE)}({names(types)})"
-                attrs = {
-                    "__display__":    class_name,
-                    "_param_types":   types,
-                    "_param_kwargs":  None,
-                }
-                class CALL_RESPONSIVE(TYPE(BASE)):
-                    def __instancecheck__(cls, instance):
-                        from comp.models.responsive import Desktop, Tablet, Phone
-                        return (
-                            instance.desktop <= Desktop and
-                            instance.tablet  <= Tablet  and
-                            instance.phone   <= Phone   and
-                            instance.desktop in types   and
-                            instance.tablet  in types   and
-                            instance.phone   in types
-                        )
             if kwargs:
                 expected = ("desktop", "tablet", "phone")
                 if set(kwargs) != set(expected):
                     raise TypeError(f"Responsive[...] keywords must be {expected}")
                 key = ("kw", tuple(sorted(kwargs.items())))
-                if key in self._param_cache:
-                    return self._param_cache[key]
-                class_name = (
-                    f"{name(BASE)}("
-                    + ", ".join(f"{k}={name(v)}" for k, v in kwargs.items())
-                    + ")"
-                )
-                attrs = {
-                    "__display__":    class_name,
-                    "_param_types":   None,
-                    "_param_kwargs":  kwargs,
-                }
-                class CALL_RESPONSIVE(TYPE(BASE)):
-                    def __instancecheck__(cls, instance):
-                        return (
-                            instance.desktop == kwargs['desktop'] and
-                            instance.tablet  == kwargs['tablet']  and
-                            instance.phone   == kwargs['phone']
-                        )
-
-            CallResposive = CALL_RESPONSIVE(class_name, (BASE,), attrs)
-            self._param_cache[key] = CallResposive
-            return CallResposive
+            else:
+                key = ("pos", args)
+
+            def build():
+                if args and not kwargs:
+                    types = args
+                    class_name = f"{name(BASE)}({names(types)})"
+                    attrs = {
+                        "__display__":    class_name,
+                        "_param_types":   types,
+                        "_param_kwargs":  None,
+                    }
+                    class CALL_RESPONSIVE(TYPE(BASE)):
+                        def __instancecheck__(cls, instance):
+                            from comp.models.responsive import Desktop, Tablet, Phone
+                            return (
+                                instance.desktop <= Desktop and
+                                instance.tablet  <= Tablet  and
+                                instance.phone   <= Phone   and
+                                instance.desktop in types   and
+                                instance.tablet  in types   and
+                                instance.phone   in types
+                            )
+                if kwargs:
+                    class_name = (
+                        f"{name(BASE)}("
+                        + ", ".join(f"{k}={name(v)}" for k, v in kwargs.items())
+                        + ")"
+                    )
+                    attrs = {
+                        "__display__":    class_name,
+                        "_param_types":   None,
+                        "_param_kwargs":  kwargs,
+                    }
+                    class CALL_RESPONSIVE(TYPE(BASE)):
+                        def __instancecheck__(cls, instance):
+                            return (
+                                instance.desktop == kwargs['desktop'] and
+                                instance.tablet  == kwargs['tablet']  and
+                                instance.phone   == kwargs['phone']
+                            )
+
+                return CALL_RESPONSIVE(class_name, (BASE,), attrs)
+            return _memo(self._param_cache, key, build)
         return type.__call__(self, *args, **kwargs)
 
     def __instancecheck__(cls, instance):
@@ -206,6 +198,8 @@ class _RESPONSIVE(TYPE(Typed)):
             return True
 
 class _RESPONSIVE_(_COMP_):
+    _products = _LRU("responsive_comp_types", _TYPE_CACHE_SIZE)
+
     def __instancecheck__(cls, instance):
         from comp.mods.types.base import Responsive, COMP
         if not instance in COMP:
@@ -219,19 +213,22 @@ class _RESPONSIVE_(_COMP_):
            and isinstance(args[2], dict):
             return type.__call__(cls, *args, **kwargs)
 
-        from comp.mods.types.base import RESPONSIVE, COMP, Responsive
-        class _CALL_RESPONSIVE_(_COMP_):
-            def __instancecheck__(cls, instance):
-                if not instance in RESPONSIVE:
-                    return False
-                return all(x in Responsive(*args, **kwargs) for x in instance.domain)
-        if args:
-            class_name = f'RESPONSIVE({names(args)})'
-        if kwargs:
-            kws = ('desktop', 'tablet', 'phone')
-            inner_name = [f"{k}={kwargs[k]}" for k in kws]
-            class_name = f"RESPONSIVE({', '.join(inner_name)})"
-        return _CALL_RESPONSIVE_(class_name, (COMP,), {
-            "__display__": class_name,
-            "__null__": None
-        })
+        def build():
+            from comp.mods.types.base import RESPONSIVE, COMP, Responsive
+            responsive = Responsive(*args, **kwargs)
+            class _CALL_RESPONSIVE_(_COMP_):
+                def __instancecheck__(cls, instance):
+                    if not instance in RESPONSIVE:
+                        return False
+                    return all(x in responsive for x in instance.domain)
+            if args:
+                class_name = f'RESPONSIVE({names(args)})'
+            if kwargs:
+                kws = ('desktop', 'tablet', 'phone')
+                inner_name = [f"{k}={kwargs[k]}" for k in kws]
+                class_name = f"RESPONSIVE({', '.join(inner_name)})"
+            return _CALL_RESPONSIVE_(class_name, (COMP,), {
+                "__display__": class_name,
+                "__null__": None
+            })
+        return _memo(cls._products, (args, tuple(sorted(kwargs.items()))), build)